@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# --- Benchmark de Inicialização ---
+# Mede, num processo Python novo a cada repetição, o tempo de `import bot_discord`
+# e a memória residente (RSS) logo depois, e o custo de aquecer as bibliotecas
+# pesadas (importacao_tardia.aquecer). Uso (na raiz do projeto):
+#
+#   python -m benchmarks.bench_inicializacao --alvo-ms 800 --alvo-mb 80
+#
+# Sai com código 1 se a partida a frio passar do alvo de tempo ou de memória.
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Roda no processo filho: imprime uma linha JSON com as medições
+_CODIGO_FILHO = r"""
+import json, sys, time
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / 2**20 if sys.platform == 'darwin' else maximo / 1024
+
+rss_python = rss_mb()
+inicio = time.perf_counter()
+import bot_discord
+import_ms = (time.perf_counter() - inicio) * 1000
+rss_import = rss_mb()
+pesados = [m for m in ('pandas', 'numpy', 'gspread', 'google.auth', 'pyarrow') if m in sys.modules]
+
+import importacao_tardia
+inicio = time.perf_counter()
+importacao_tardia.aquecer()
+aquecer_ms = (time.perf_counter() - inicio) * 1000
+
+print(json.dumps({
+    'rss_python_mb': rss_python, 'import_ms': import_ms, 'rss_import_mb': rss_import,
+    'pesados_no_import': pesados, 'aquecer_ms': aquecer_ms, 'rss_aquecido_mb': rss_mb(),
+}))
+"""
+
+def medir_uma_vez():
+    ambiente = dict(os.environ)
+    # bot_discord lê estes IDs do .env na importação; aqui qualquer valor serve
+    ambiente.setdefault('LOG_CHANNEL_ID', '1')
+    ambiente.setdefault('GUILD_ID', '1')
+    saida = subprocess.run(
+        [sys.executable, '-c', _CODIGO_FILHO], cwd=RAIZ, env=ambiente,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de import e memória (RSS) na partida do bot.")
+    parser.add_argument('--repeticoes', type=int, default=5, help="processos novos medidos (vale a mediana)")
+    parser.add_argument('--alvo-ms', type=float, default=1000.0, help="tempo máximo aceito para `import bot_discord`")
+    parser.add_argument('--alvo-mb', type=float, default=120.0, help="RSS máximo aceito logo após o import")
+    args = parser.parse_args(argv)
+
+    medicoes = [medir_uma_vez() for _ in range(args.repeticoes)]
+
+    def mediana(chave):
+        valores = sorted(m[chave] for m in medicoes)
+        return valores[len(valores) // 2]
+
+    import_ms, rss_import = mediana('import_ms'), mediana('rss_import_mb')
+    print(f"Python sozinho:            {mediana('rss_python_mb'):>7.1f} MB")
+    print(f"import bot_discord:        {import_ms:>7.0f} ms  {rss_import:>7.1f} MB")
+    print(f"  pesados já carregados:   {', '.join(medicoes[0]['pesados_no_import']) or 'nenhum'}")
+    print(f"aquecer (após on_ready):   {mediana('aquecer_ms'):>7.0f} ms  {mediana('rss_aquecido_mb'):>7.1f} MB")
+
+    estourou = []
+    if import_ms > args.alvo_ms:
+        estourou.append(f"tempo {import_ms:.0f}ms > {args.alvo_ms:.0f}ms")
+    if rss_import > args.alvo_mb:
+        estourou.append(f"memória {rss_import:.1f}MB > {args.alvo_mb:.1f}MB")
+    if estourou:
+        print(f"\nPartida a frio acima do alvo: {'; '.join(estourou)}")
+        return 1
+    print("\nPartida a frio dentro do alvo.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import cota_sheets
+import processador_csv
+from processador_csv import (
+    LayoutCabecalho, analisar_pendencias, carregar_dataframe, encontrar_pendencias, normalizar_coluna,
+    TAREFAS_PRINCIPAIS,
+)
+from benchmarks.planilha_falsa import PlanilhaFalsa, gerar_planilha, instalar_conexao
+
+# --- Benchmark do Processador ---
+# Mede tempo (melhor de N repetições) e pico de memória (tracemalloc, numa
+# execução à parte) de cada etapa sobre planilhas sintéticas, e compara com
+# o baseline salvo. Uso (na raiz do projeto):
+#
+#   python -m benchmarks.bench_processador                        # 1k, 10k e 50k linhas
+#   python -m benchmarks.bench_processador --tamanhos 1000,200000
+#   python -m benchmarks.bench_processador --salvar-baseline      # grava o baseline
+#   python -m benchmarks.bench_processador --ci                   # sem baseline = falha
+#
+# Sai com código 1 se alguma etapa passar do baseline além da tolerância.
+# O baseline.json versionado guarda em '_ambiente' a máquina e as versões de
+# Python/pandas em que foi medido: compare só com números da mesma máquina.
+
+BASELINE_PADRAO = os.path.join(os.path.dirname(__file__), 'baseline.json')
+TAMANHOS_PADRAO = '1000,10000,50000'
+# Chave do baseline com o ambiente da medição (não é um tamanho de planilha)
+CHAVE_AMBIENTE = '_ambiente'
+
+def ambiente():
+    """Máquina e versões em que os números foram medidos."""
+    return {
+        'maquina': platform.machine(),
+        'processador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+        'sistema': platform.platform(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+def _etapas(valores):
+    """(nome, função sem argumentos) de cada etapa medida, sobre os mesmos dados."""
+    planilha = PlanilhaFalsa(valores)
+    df = carregar_dataframe(planilha)
+    planejados = [
+        df[coluna]
+        for tarefa in TAREFAS_PRINCIPAIS
+        for coluna in [f'{tarefa}_Planejado']
+        if coluna in df.columns
+    ]
+    df_valido = df.dropna(subset=['Componente Curricular'])
+    instalar_conexao(planilha)
+
+    return [
+        ('mapeamento_cabecalho', lambda: LayoutCabecalho(valores[0], valores[1])),
+        ('construcao_dataframe', lambda: carregar_dataframe(planilha)),
+        ('normalizacao_datas', lambda: [normalizar_coluna(serie.to_numpy()) for serie in planejados]),
+        ('deteccao_pendencias', lambda: analisar_pendencias(df_valido)),
+        ('encontrar_pendencias', lambda: encontrar_pendencias(incremental=False)),
+    ]
+
+def _medir_tempo(funcao, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def _medir_memoria(funcao):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def rodar(tamanhos, repeticoes):
+    """Resultados {tamanho: {etapa: {'segundos', 'pico_mb'}}}."""
+    resultados = {}
+    for tamanho in tamanhos:
+        valores = gerar_planilha(tamanho)
+        resultados[str(tamanho)] = {}
+        for nome, funcao in _etapas(valores):
+            segundos = _medir_tempo(funcao, repeticoes)
+            pico_mb = _medir_memoria(funcao) / 2**20
+            resultados[str(tamanho)][nome] = {'segundos': round(segundos, 6), 'pico_mb': round(pico_mb, 3)}
+            print(f"{tamanho:>8} linhas  {nome:<22} {segundos * 1000:>10.1f} ms  {pico_mb:>9.1f} MB", flush=True)
+    return resultados
+
+def comparar(resultados, baseline, tolerancia):
+    """Lista de regressões (texto) em relação ao baseline."""
+    regressoes = []
+    for tamanho, etapas in resultados.items():
+        for etapa, atual in etapas.items():
+            anterior = baseline.get(tamanho, {}).get(etapa)
+            if not anterior:
+                continue
+            for metrica in ('segundos', 'pico_mb'):
+                # Ruído de medição: ignora variações em valores muito pequenos
+                if anterior[metrica] < 0.001:
+                    continue
+                razao = atual[metrica] / anterior[metrica]
+                if razao > 1 + tolerancia:
+                    regressoes.append(
+                        f"{etapa} ({tamanho} linhas): {metrica} {anterior[metrica]} -> {atual[metrica]} (+{(razao - 1) * 100:.0f}%)"
+                    )
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do processador sobre planilhas sintéticas.")
+    parser.add_argument('--tamanhos', default=TAMANHOS_PADRAO, help="linhas por planilha, separadas por vírgula (ex: 1000,200000)")
+    parser.add_argument('--repeticoes', type=int, default=3, help="repetições por etapa (vale a mais rápida)")
+    parser.add_argument('--baseline', default=BASELINE_PADRAO, help="arquivo JSON do baseline")
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="piora aceita antes de acusar regressão (0.25 = 25%%)")
+    parser.add_argument('--salvar-baseline', action='store_true', help="grava os resultados como novo baseline")
+    parser.add_argument('--ci', action='store_true', help="falha (código 1) se o arquivo de baseline não existir")
+    args = parser.parse_args(argv)
+
+    # Cada execução lê a planilha "da rede" (sem servir o snapshot em disco)
+    processador_csv.CACHE_IDADE_MAXIMA = 0
+    # Mede só o processamento: sem o ritmo por minuto da cota do Sheets
+    cota_sheets.gerenciador = cota_sheets.GerenciadorCota(leituras_por_minuto=0, escritas_por_minuto=0)
+
+    tamanhos = [int(t) for t in args.tamanhos.split(',') if t.strip()]
+    print(f"Python {platform.python_version()}, pandas {pd.__version__}, {args.repeticoes} repetição(ões) por etapa\n")
+    resultados = rodar(tamanhos, args.repeticoes)
+
+    if args.salvar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({CHAVE_AMBIENTE: ambiente(), **resultados}, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"\nBaseline salvo em '{args.baseline}'.")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nSem baseline em '{args.baseline}'. Rode com --salvar-baseline para criar um.")
+        return 1 if args.ci else 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    medido_em = baseline.pop(CHAVE_AMBIENTE, {})
+    atual = ambiente()
+    diferencas = [f"{k}: {medido_em.get(k)} -> {v}" for k, v in atual.items() if medido_em.get(k) != v]
+    if diferencas:
+        print("\nAviso: o baseline foi medido em outro ambiente; os tempos podem não ser comparáveis.")
+        for d in diferencas:
+            print(f"  - {d}")
+    regressoes = comparar(resultados, baseline, args.tolerancia)
+    if regressoes:
+        print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia * 100:.0f}%:")
+        for r in regressoes:
+            print(f"  - {r}")
+        return 1
+    print("\nNenhuma regressão em relação ao baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
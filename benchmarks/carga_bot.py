@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+# bot_discord lê estes IDs do .env na importação; no teste de carga qualquer valor serve
+os.environ.setdefault('LOG_CHANNEL_ID', '1')
+os.environ.setdefault('GUILD_ID', '1')
+
+import discord
+import bot_discord
+import cota_sheets
+import metricas
+import processador_csv
+from estado_lembretes import EstadoLembretes
+from benchmarks.planilha_falsa import PESSOAS, PlanilhaFalsa, gerar_planilha, instalar_conexao
+
+# --- Teste de Carga do Bot (Discord e Sheets falsos) ---
+# Simula N pessoas clicando em "Sim, finalizei!" ao mesmo tempo em que roda uma
+# verificação agendada, tudo pelo caminho real do bot (tratar_componentes ->
+# confirmar_tarefa -> fila de escrita -> batch_update), com uma aba em memória
+# que pode ter latência e 429 injetados. Uso (na raiz do projeto):
+#
+#   python -m benchmarks.carga_bot --usuarios 50 --cliques 4 --latencia 0.3 --taxa-429 0.05
+#
+# Relata cliques/s, percentis de latência, chamadas ao Sheets/Discord e quanto
+# tempo o event loop ficou travado (gateway sem responder).
+
+class ContadorDiscord:
+    """Conta as chamadas feitas aos objetos falsos do Discord."""
+    def __init__(self, latencia):
+        self.latencia = latencia
+        self.chamadas = {}
+
+    async def registrar(self, metodo):
+        self.chamadas[metodo] = self.chamadas.get(metodo, 0) + 1
+        if self.latencia:
+            await asyncio.sleep(self.latencia * random.uniform(0.5, 1.5))
+
+class CanalFalso:
+    def __init__(self, contador, nome='canal-de-log'):
+        self.contador = contador
+        self.name = nome
+
+    async def send(self, *args, **kwargs):
+        await self.contador.registrar('canal.send')
+
+class UsuarioFalso(discord.User):
+    """Passa no isinstance(..., discord.User) do bot sem estado do gateway."""
+    def __init__(self, contador, id):
+        self.contador = contador
+        self.id = id
+        self.name = f"usuario-{id}"
+
+    async def send(self, *args, **kwargs):
+        await self.contador.registrar('dm.send')
+
+    def __str__(self):
+        return self.name
+
+class MensagemFalsa:
+    def __init__(self, contador):
+        self.contador = contador
+        self.components = []
+
+    async def edit(self, **kwargs):
+        await self.contador.registrar('message.edit')
+
+class RespostaFalsa:
+    def __init__(self, contador):
+        self.contador = contador
+
+    async def defer(self, **kwargs):
+        await self.contador.registrar('response.defer')
+
+class AcompanhamentoFalso:
+    def __init__(self, contador):
+        self.contador = contador
+        self.mensagens = []
+
+    async def send(self, mensagem, **kwargs):
+        self.mensagens.append(mensagem)
+        await self.contador.registrar('followup.send')
+
+class ClienteFalso:
+    def __init__(self, canal_log):
+        self.canal_log = canal_log
+
+    def get_channel(self, _id):
+        return self.canal_log
+
+class InteracaoFalsa:
+    """Clique num componente do bot, como o gateway entregaria ao on_interaction."""
+    type = discord.InteractionType.component
+
+    def __init__(self, contador, canal_log, custom_id, usuario):
+        self.data = {'custom_id': custom_id}
+        self.message = MensagemFalsa(contador)
+        self.response = RespostaFalsa(contador)
+        self.followup = AcompanhamentoFalso(contador)
+        self.client = ClienteFalso(canal_log)
+        self.user = usuario
+
+async def monitorar_loop(parar, intervalo=0.01):
+    """Mede o atraso do event loop: quanto cada tick de `intervalo` passou do previsto."""
+    atrasos = []
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(intervalo)
+        atrasos.append(max(0.0, time.perf_counter() - inicio - intervalo))
+    return atrasos
+
+def percentil(valores, q):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+async def simular_usuario(usuario, alvos, contador, canal_log, intervalo, latencias, erros):
+    for row_index, tarefa in alvos:
+        await asyncio.sleep(random.uniform(0, intervalo))
+        custom_id = f"{bot_discord.PREFIXO_ID}:sim:{bot_discord.chave_compacta(row_index, tarefa)}"
+        interacao = InteracaoFalsa(contador, canal_log, custom_id, usuario)
+        inicio = time.perf_counter()
+        await bot_discord.tratar_componentes(interacao)
+        latencias.append(time.perf_counter() - inicio)
+        # Quando a gravação falha, confirmar_tarefa responde com o aviso de erro
+        if any(m.startswith("⚠️") for m in interacao.followup.mensagens):
+            erros.append((row_index, tarefa))
+
+async def rodar(args):
+    random.seed(args.semente)
+    planilha = PlanilhaFalsa(gerar_planilha(args.linhas, semente=args.semente),
+                             latencia=args.latencia, taxa_429=args.taxa_429, semente=args.semente)
+    instalar_conexao(planilha)
+    processador_csv.CACHE_IDADE_MAXIMA = 0
+    cota_sheets.gerenciador.backoff_base = args.backoff
+    # Estado de lembretes vazio: toda pendência conta como nova e recebe a DM
+    bot_discord.lembretes = EstadoLembretes(os.path.join(tempfile.mkdtemp(prefix='carga_'), 'lembretes.sqlite3'))
+
+    contador = ContadorDiscord(args.latencia_discord)
+    canal_log = CanalFalso(contador)
+    usuarios = [UsuarioFalso(contador, 1000 + i) for i in range(args.usuarios)]
+
+    # O bot falso: canal de log, usuários e USER_MAP apontando para os objetos acima
+    por_id = {u.id: u for u in usuarios}
+    bot_discord.bot.get_channel = lambda _id: canal_log
+    bot_discord.bot.get_user = lambda _id: por_id.get(_id)
+    bot_discord.USER_MAP = {pessoa.strip(): usuarios[i % len(usuarios)].id for i, pessoa in enumerate(PESSOAS)}
+
+    # Cada usuário clica em tarefas pendentes distintas
+    pendentes = [(p.row_index, p.tarefa) for p in processador_csv.analisar_pendencias(
+        processador_csv.carregar_dataframe(PlanilhaFalsa(planilha.valores)).dropna(subset=['Componente Curricular'])
+    )]
+    random.shuffle(pendentes)
+    planilha.chamadas.clear()
+    if len(pendentes) < args.usuarios * args.cliques:
+        print(f"Aviso: só {len(pendentes)} pendências para {args.usuarios * args.cliques} cliques; aumente --linhas.")
+
+    latencias, erros = [], []
+    parar = asyncio.Event()
+    monitor = asyncio.create_task(monitorar_loop(parar))
+
+    async def cronometrar(coro):
+        inicio = time.perf_counter()
+        await coro
+        return time.perf_counter() - inicio
+
+    # Cliques e verificação agendada disputando o mesmo event loop e a mesma aba
+    duracao_cliques, duracao_verificacao = await asyncio.gather(
+        cronometrar(asyncio.gather(*(
+            simular_usuario(
+                usuario, pendentes[i * args.cliques:(i + 1) * args.cliques],
+                contador, canal_log, args.intervalo, latencias, erros
+            )
+            for i, usuario in enumerate(usuarios)
+        ))),
+        cronometrar(bot_discord.verificar_pendencias()),
+    )
+    duracao = max(duracao_cliques, duracao_verificacao)
+
+    parar.set()
+    atrasos = await monitor
+
+    total = len(latencias)
+    print(f"\n=== Cliques ({args.usuarios} usuário(s) x {args.cliques}) ===")
+    print(f"  {total} cliques em {duracao_cliques:.2f}s -> {total / duracao_cliques:.1f} confirmações/s ({len(erros)} com erro)")
+    print(
+        f"  latência p50 {percentil(latencias, 0.5) * 1000:.0f}ms | p90 {percentil(latencias, 0.9) * 1000:.0f}ms"
+        f" | p99 {percentil(latencias, 0.99) * 1000:.0f}ms | máx {max(latencias, default=0) * 1000:.0f}ms"
+    )
+    print(f"\n=== Verificação agendada (concorrente) ===\n  {duracao_verificacao:.2f}s")
+    print(f"\n=== Chamadas ao Sheets ===")
+    for metodo, n in sorted(planilha.chamadas.items()):
+        print(f"  {metodo}: {n}")
+    print(f"  429 injetados: {planilha.erros_429}")
+    print(f"\n=== Chamadas ao Discord ===")
+    for metodo, n in sorted(contador.chamadas.items()):
+        print(f"  {metodo}: {n}")
+    travado = sum(a for a in atrasos if a > 0.05)
+    print(f"\n=== Event loop (gateway) ===")
+    print(
+        f"  atraso máx {max(atrasos, default=0) * 1000:.0f}ms | p99 {percentil(atrasos, 0.99) * 1000:.0f}ms"
+        f" | tempo travado (>50ms) {travado:.2f}s de {duracao:.2f}s"
+    )
+    print(f"\n=== Métricas por etapa ===\n{metricas.resumo_texto()}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do bot com Discord e Sheets falsos.")
+    parser.add_argument('--usuarios', type=int, default=20, help="usuários clicando ao mesmo tempo")
+    parser.add_argument('--cliques', type=int, default=3, help="cliques por usuário")
+    parser.add_argument('--intervalo', type=float, default=1.0, help="espera máxima (s) antes de cada clique")
+    parser.add_argument('--linhas', type=int, default=300, help="linhas da planilha sintética (cada uma vira ~2 DMs na verificação)")
+    parser.add_argument('--latencia', type=float, default=0.2, help="latência média (s) de cada chamada ao Sheets")
+    parser.add_argument('--taxa-429', type=float, default=0.0, help="fração das chamadas ao Sheets que recebem 429")
+    parser.add_argument('--latencia-discord', type=float, default=0.05, help="latência média (s) de cada chamada ao Discord")
+    parser.add_argument('--backoff', type=float, default=0.2, help="base (s) do backoff do Sheets após 429")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    asyncio.run(rodar(args))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
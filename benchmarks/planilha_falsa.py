@@ -0,0 +1,172 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import requests
+from gspread.exceptions import APIError
+from gspread.utils import a1_range_to_grid_range, a1_to_rowcol
+import processador_csv
+from processador_csv import ConexaoSheets, TAREFAS_PRINCIPAIS
+
+# --- Planilha Sintética (para benchmarks) ---
+# Gera abas no formato do cronograma: duas linhas de cabeçalho (colunas fixas +
+# um grupo Resp./Planejado/Realizado/<status> por tarefa) e linhas de cursos com
+# datas nos formatos que aparecem na planilha real ('03/nov.', '3/dez', '09/09').
+
+COLUNAS_FIXAS = ['Entrega', 'Componente Curricular', 'Etapa', '% Conclusão']
+SUBCOLUNAS = ['Resp.', 'Planejado', 'Realizado', '']
+
+PESSOAS = ['Ana', 'Bruno', ' Carla ', 'NIC (2 Entregas)', 'Diego', 'Elisa']
+MESES = ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez']
+
+def _data_aleatoria(rnd):
+    """Data em um dos formatos usados na planilha (ou vazia)."""
+    dia = rnd.randint(1, 28)
+    mes = rnd.randint(1, 12)
+    formato = rnd.random()
+    if formato < 0.35:
+        return f"{dia:02d}/{MESES[mes - 1]}."   # 03/nov.
+    if formato < 0.6:
+        return f"{dia}/{MESES[mes - 1]}"        # 3/dez
+    if formato < 0.75:
+        return f"{dia}/{MESES[mes - 1].capitalize()}."  # 3/Dez.
+    if formato < 0.95:
+        return f"{dia:02d}/{mes:02d}"           # 09/09
+    return ''
+
+def gerar_cabecalho():
+    """As duas linhas de cabeçalho (tarefas na linha 1, subcolunas na linha 2)."""
+    headers_row_1 = [''] * len(COLUNAS_FIXAS)
+    headers_row_2 = list(COLUNAS_FIXAS)
+    for tarefa in TAREFAS_PRINCIPAIS:
+        headers_row_1 += [tarefa] + [''] * (len(SUBCOLUNAS) - 1)
+        headers_row_2 += SUBCOLUNAS
+    return headers_row_1, headers_row_2
+
+def gerar_planilha(linhas, semente=0, fracao_pendente=0.3):
+    """
+    Valores da aba (como o get_all_values devolve): cabeçalho + `linhas` cursos.
+    `fracao_pendente` é a chance de cada tarefa estar TRUE e sem data de realização.
+    """
+    rnd = random.Random(semente)
+    headers_row_1, headers_row_2 = gerar_cabecalho()
+    valores = [headers_row_1, headers_row_2]
+    for i in range(linhas):
+        # ~2% de linhas de espaçamento (sem curso)
+        curso = f"Curso {i:06d}" if rnd.random() > 0.02 else ''
+        linha = [str(i // 10 + 1), curso, rnd.choice(['Produção', 'Revisão']), f"{rnd.randint(0, 100)}%"]
+        for _ in TAREFAS_PRINCIPAIS:
+            pendente = rnd.random() < fracao_pendente
+            linha += [
+                rnd.choice(PESSOAS) if rnd.random() > 0.1 else rnd.choice(['-', 'FINALIZADO', '']),
+                _data_aleatoria(rnd),
+                '' if pendente else _data_aleatoria(rnd),
+                'TRUE' if pendente or rnd.random() < 0.5 else 'FALSE',
+            ]
+        valores.append(linha)
+    return valores
+
+def erro_api(status, mensagem='Quota exceeded'):
+    """APIError do gspread como o Google devolveria para o status HTTP informado."""
+    resposta = requests.Response()
+    resposta.status_code = status
+    resposta._content = json.dumps({'error': {'code': status, 'message': mensagem, 'status': 'ERRO_SIMULADO'}}).encode('utf-8')
+    return APIError(resposta)
+
+class PlanilhaFalsa:
+    """
+    Aba do gspread em memória: get_all_values, get, batch_get e batch_update
+    sobre uma lista de listas. Como a API real, corta células vazias no final
+    das linhas/colunas lidas. `chamadas` conta as chamadas por método.
+    Para testes de carga, cada chamada pode esperar `latencia` segundos (±50%)
+    e falhar com 429 na proporção `taxa_429` (contadas em `erros_429`).
+    """
+
+    title = 'Aba Sintética'
+
+    def __init__(self, valores, spreadsheet_id='planilha-sintetica', id=0, latencia=0.0, taxa_429=0.0, semente=0):
+        self.valores = [list(linha) for linha in valores]
+        self.spreadsheet_id = spreadsheet_id
+        self.id = id
+        self.latencia = latencia
+        self.taxa_429 = taxa_429
+        self.chamadas = {}
+        self.erros_429 = 0
+        self._rnd = random.Random(semente)
+        self._lock = threading.Lock()
+
+    def _contar(self, metodo):
+        with self._lock:
+            self.chamadas[metodo] = self.chamadas.get(metodo, 0) + 1
+            falhar = self.taxa_429 > 0 and self._rnd.random() < self.taxa_429
+            if falhar:
+                self.erros_429 += 1
+            espera = self.latencia * self._rnd.uniform(0.5, 1.5) if self.latencia > 0 else 0
+        if espera:
+            time.sleep(espera)
+        if falhar:
+            raise erro_api(429)
+
+    def _intervalo(self, a1):
+        grade = a1_range_to_grid_range(a1)
+        largura = max(map(len, self.valores), default=0)
+        r0, r1 = grade.get('startRowIndex', 0), grade.get('endRowIndex', len(self.valores))
+        c0, c1 = grade.get('startColumnIndex', 0), grade.get('endColumnIndex', largura)
+        recorte = [list(linha[c0:c1]) for linha in self.valores[r0:r1]]
+        for linha in recorte:
+            while linha and linha[-1] == '':
+                linha.pop()
+        while recorte and not recorte[-1]:
+            recorte.pop()
+        return recorte
+
+    @property
+    def row_count(self):
+        return len(self.valores)
+
+    def get_all_values(self):
+        self._contar('get_all_values')
+        return [list(linha) for linha in self.valores]
+
+    def get(self, a1):
+        self._contar('get')
+        return self._intervalo(a1)
+
+    def batch_get(self, intervalos):
+        self._contar('batch_get')
+        return [self._intervalo(a1) for a1 in intervalos]
+
+    def batch_update(self, dados, value_input_option=None):
+        self._contar('batch_update')
+        with self._lock:
+            for item in dados:
+                linha, coluna = a1_to_rowcol(item['range'])
+                while len(self.valores) < linha:
+                    self.valores.append([])
+                celulas = self.valores[linha - 1]
+                celulas.extend([''] * (coluna - len(celulas)))
+                celulas[coluna - 1] = item['values'][0][0]
+        return {}
+
+class ConexaoFalsa(ConexaoSheets):
+    """ConexaoSheets que entrega uma PlanilhaFalsa (sem credenciais nem rede); cache em pasta temporária."""
+
+    def __init__(self, planilha, sheet_id='planilha-sintetica', sheet_name='Aba Sintética'):
+        super().__init__(sheet_id, sheet_name, arquivo_credencial=None)
+        self.planilha = planilha
+        self.caminho_cache = os.path.join(tempfile.mkdtemp(prefix='botedu-bench-'), 'planilha.parquet')
+
+    def worksheet(self):
+        return self.planilha
+
+    def invalidar(self):
+        pass
+
+def instalar_conexao(planilha):
+    """Registra uma ConexaoFalsa como a conexão padrão do processador e a retorna."""
+    conexao = ConexaoFalsa(planilha)
+    with processador_csv._conexoes_lock:
+        processador_csv._conexoes[(processador_csv.SHEET_ID, processador_csv.SHEET_NAME)] = conexao
+    return conexao
@@ -0,0 +1,67 @@
+import argparse
+import gc
+import sys
+import tracemalloc
+from processador_csv import analisar_pendencias, carregar_dataframe
+from benchmarks.planilha_falsa import PlanilhaFalsa, gerar_planilha
+
+# --- Relatório de Memória ---
+# Compara, para planilhas sintéticas de vários tamanhos:
+#   - o DataFrame da aba só com texto (compactar=False) x com category/bool;
+#   - as pendências como dicts de 5 chaves x Pendencia (com __slots__).
+# Uso (na raiz do projeto):
+#
+#   python -m benchmarks.relatorio_memoria --tamanhos 10000,100000
+
+def _mb(n_bytes):
+    return n_bytes / 2**20
+
+def _memoria_df(df):
+    return int(df.memory_usage(deep=True).sum())
+
+def _memoria_lista(construir):
+    """Bytes alocados (e ainda vivos) ao montar a lista devolvida por `construir()`."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        lista = construir()
+        atual = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del lista
+    return atual
+
+def relatorio(tamanho):
+    planilha = PlanilhaFalsa(gerar_planilha(tamanho))
+    df_texto = carregar_dataframe(planilha, compactar=False)
+    df_compacto = carregar_dataframe(planilha)
+    pendencias = analisar_pendencias(df_compacto.dropna(subset=['Componente Curricular']))
+
+    # Mesmas strings nos dois casos: mede só o contêiner de cada pendência
+    como_dicts = _memoria_lista(lambda: [
+        {"pessoa": p.pessoa, "curso": p.curso, "tarefa": p.tarefa, "dia": p.dia, "row_index": p.row_index}
+        for p in pendencias
+    ])
+    como_registros = _memoria_lista(lambda: [
+        type(p)(p.pessoa, p.curso, p.tarefa, p.dia, p.row_index) for p in pendencias
+    ])
+
+    texto, compacto = _memoria_df(df_texto), _memoria_df(df_compacto)
+    print(f"\n{tamanho} linhas ({len(pendencias)} pendências)")
+    print(f"  DataFrame  texto {_mb(texto):>9.1f} MB | compacto {_mb(compacto):>9.1f} MB | {texto / compacto:>5.1f}x menor")
+    print(f"  Pendências dicts {_mb(como_dicts):>9.2f} MB | slots    {_mb(como_registros):>9.2f} MB | {como_dicts / como_registros:>5.1f}x menor")
+
+    por_tipo = df_compacto.memory_usage(deep=True, index=False).groupby(df_compacto.dtypes.astype(str).str.split('(').str[0]).sum()
+    for tipo, n_bytes in por_tipo.sort_values(ascending=False).items():
+        print(f"    {tipo:<12} {_mb(n_bytes):>9.1f} MB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memória do DataFrame e das pendências: texto/dicts x tipos compactos/slots.")
+    parser.add_argument('--tamanhos', default='10000,50000', help="linhas por planilha, separadas por vírgula")
+    args = parser.parse_args(argv)
+    for tamanho in [int(t) for t in args.tamanhos.split(',') if t.strip()]:
+        relatorio(tamanho)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,12 +3,24 @@ from discord.ext import tasks
 import os
 from dotenv import load_dotenv
 import asyncio
+import importlib.util
+import sqlite3
+import time as time_mod
 from datetime import time, datetime
-# Importa as funções de leitura e escrita do Sheets
-from processador_csv import encontrar_pendencias, atualizar_status_sheets 
+# Importa as versões assíncronas (rodam fora do event loop) da leitura e escrita do Sheets
+from processador_csv import (
+    encontrar_pendencias_async, atualizar_status_sheets_async, interpretar_data, priorizar_pendencias, TAREFAS_PRINCIPAIS
+)
+from despachante_dm import DespachanteDM, ResolvedorDestinatarios, ids_destino
+from estado_lembretes import EstadoLembretes
+import indice_pendencias
+from log_config import RESUMO, configurar_logging, obter_logger
+import importacao_tardia
+import metricas
 
 # --- Configuração ---
 load_dotenv()
+log = obter_logger('bot')
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 LOG_CHANNEL_ID = int(os.getenv('LOG_CHANNEL_ID')) 
 GUILD_ID = int(os.getenv('GUILD_ID'))
@@ -34,22 +46,75 @@ USER_MAP = {
     # "Viviane": [1342689810686541854, 1430522936808177708, 1430685951541121110], 
 }
 
+# Modo resumo: uma mensagem por pessoa (com menu de tarefas) em vez de uma DM por pendência
+MODO_RESUMO = os.getenv('MODO_RESUMO', '0') == '1'
+# Limites do Discord: 25 opções por menu, 5 menus por mensagem, 2000 caracteres por mensagem
+OPCOES_POR_MENU = 25
+MENUS_POR_MENSAGEM = 5
+LIMITE_CARACTERES = 2000
+# Reaproveita uma verificação concluída há no máximo N segundos em vez de ler tudo de novo (0 = sempre lê)
+VERIFICACAO_IDADE_MAXIMA = int(os.getenv('VERIFICACAO_IDADE_MAXIMA', '0'))
+# Carrega pandas/gspread/google-auth numa thread logo após o on_ready (senão, na primeira leitura)
+AQUECER_IMPORTACOES = os.getenv('AQUECER_IMPORTACOES', '1') == '1'
+# Recarga só de leitura (sem DMs) do índice de /pendencias, em minutos; 0 = só na partida e nas verificações
+INDICE_ATUALIZAR_MINUTOS = int(os.getenv('INDICE_ATUALIZAR_MINUTOS', '30'))
+
 # --- Horários para o bot rodar (fuso horário UTC por padrão) ---
 SCHEDULED_TIMES = [
     time(12, 0),  # 09:00 BRT
     time(21, 0),  # 18:00 BRT
 ]
 
-def criar_mensagem_pendencia(pessoa, curso, tarefa, dia):
+def criar_mensagem_pendencia(pessoa, curso, tarefa, dia, dias_atraso=0):
     """Cria a mensagem de cobrança inicial para DM."""
     mention = f"**{pessoa}**"
+    atraso = f"⏰ Pelo cronograma, ela está **{dias_atraso} dia(s) atrasada**.\n" if dias_atraso > 0 else ""
     
     return (
         f"Olá {mention}! 👋\n"
         f"Notei que a tarefa **'{tarefa}'** do curso **'{curso}'** estava planejada para **{dia}**.\n"
+        f"{atraso}"
         f"Você já finalizou?"
     )
 
+def criar_mensagem_resumo(pessoa, pendencias):
+    """Cria a mensagem de resumo com todas as tarefas da pessoa (cabe no limite do Discord)."""
+    cabecalho = (
+        f"Olá **{pessoa}**! 👋\n"
+        f"Você tem **{len(pendencias)}** tarefa(s) com prazo planejado e ainda sem conclusão:\n"
+    )
+    rodape = "\nJá finalizou alguma? Marque no menu abaixo e eu atualizo a planilha."
+
+    linhas = []
+    espaco = LIMITE_CARACTERES - len(cabecalho) - len(rodape) - 40  # reserva para o "... e mais N"
+    for i, p in enumerate(pendencias):
+        atraso = f", **{p.dias_atraso} dia(s) de atraso**" if p.dias_atraso > 0 else ""
+        linha = f"- **{p.tarefa}** — {p.curso} (prazo **{p.dia}**{atraso})\n"
+        if len(linha) > espaco:
+            linhas.append(f"- ... e mais {len(pendencias) - i} tarefa(s) no menu.\n")
+            break
+        espaco -= len(linha)
+        linhas.append(linha)
+
+    return cabecalho + "".join(linhas) + rodape
+
+def criar_mensagem_consulta(titulo, pendencias, indice):
+    """Lista de pendências de uma consulta (/pendencias), cortada no limite do Discord."""
+    cabecalho = f"{titulo}: **{len(pendencias)}** pendência(s) (dados de {indice.idade / 60:.0f} min atrás)\n"
+    linhas = []
+    espaco = LIMITE_CARACTERES - len(cabecalho) - 40  # reserva para o "... e mais N"
+    for i, p in enumerate(pendencias):
+        atraso = f", **{p.dias_atraso} dia(s) de atraso**" if p.dias_atraso > 0 else ""
+        linha = f"- **{p.tarefa}** — {p.curso} · {p.pessoa} (prazo {p.dia or '—'}{atraso})\n"
+        if len(linha) > espaco:
+            linhas.append(f"- ... e mais {len(pendencias) - i} pendência(s).\n")
+            break
+        espaco -= len(linha)
+        linhas.append(linha)
+    return cabecalho + "".join(linhas)
+
+MSG_SEM_INDICE = "Os dados da planilha ainda estão sendo carregados desde que o bot iniciou. Tente de novo em instantes."
+
 MSG_PARABENS = (
     "Parabéns! 🥳 Ótimo trabalho, já atualizei aqui."
     " (A atualização na planilha foi enviada, mas verifique o canal de logs em caso de erro!)"
@@ -60,235 +125,495 @@ MSG_ENCORAJAMENTO = (
     "Qualquer dificuldade, avise a equipe!"
 )
 
+# --- Botões Persistentes ---
+# O estado de cada botão/menu vai no próprio custom_id (fonte + linha do Sheets +
+# índice da tarefa), então as mensagens não guardam View em memória e continuam funcionando
+# depois de reiniciar o bot: um único handler (tratar_componentes) atende todas.
+
+PREFIXO_ID = "botedu"
+INDICE_TAREFA = {tarefa.strip(): i for i, tarefa in enumerate(TAREFAS_PRINCIPAIS)}
+
+def chave_compacta(row_index, tarefa, fonte=None):
+    """Codifica (linha, tarefa, fonte) como 'fonte:linha:indice_tarefa' (ex: '3f2a9c1b:57:3')."""
+    chave = f"{int(row_index)}:{INDICE_TAREFA[tarefa.strip()]}"
+    return f"{fonte}:{chave}" if fonte else chave
+
+def ler_chave_compacta(chave):
+    """
+    Decodifica a chave em (linha, nome da tarefa, fonte).
+    Chaves antigas, sem fonte ('linha:indice_tarefa'), apontam para a primeira fonte.
+    """
+    partes = chave.split(":")
+    fonte = partes.pop(0) if len(partes) == 3 else None
+    linha, indice = partes
+    return int(linha), TAREFAS_PRINCIPAIS[int(indice)].strip(), fonte
+
 class TaskView(discord.ui.View):
-    """Cria os botões 'Sim' e 'Não'."""
-    def __init__(self, pendencia):
-        super().__init__(timeout=86400)
-        self.pendencia = pendencia
-
-    @discord.ui.button(label="Sim, finalizei!", style=discord.ButtonStyle.success)
-    async def sim_callback(self, button: discord.ui.Button, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True, invisible=False)
+    """Cria os botões 'Sim' e 'Não' (sem estado em memória; ver tratar_componentes)."""
+    def __init__(self, row_index, tarefa, desabilitado=False, fonte=None):
+        super().__init__(timeout=None, store=False)
+        chave = chave_compacta(row_index, tarefa, fonte)
+        self.add_item(discord.ui.Button(
+            label="Sim, finalizei!", style=discord.ButtonStyle.success,
+            custom_id=f"{PREFIXO_ID}:sim:{chave}", disabled=desabilitado
+        ))
+        self.add_item(discord.ui.Button(
+            label="Ainda não", style=discord.ButtonStyle.danger,
+            custom_id=f"{PREFIXO_ID}:nao:{chave}", disabled=desabilitado
+        ))
+
+def opcoes_resumo(pendencias):
+    """Opções do menu de resumo; o value de cada uma é a chave compacta da tarefa."""
+    return [
+        discord.SelectOption(
+            label=f"{p.tarefa} — {p.curso}"[:100],
+            description=f"Prazo {p.dia} · linha {p.row_index}"[:100],
+            value=chave_compacta(p.row_index, p.tarefa, p.fonte)
+        )
+        for p in pendencias
+    ]
+
+class ResumoView(discord.ui.View):
+    """Um menu para cada bloco de até 25 tarefas da pessoa (sem estado em memória)."""
+    def __init__(self, blocos_opcoes):
+        super().__init__(timeout=None, store=False)
+        for n, opcoes in enumerate(blocos_opcoes, start=1):
+            parte = f"{n}/{len(blocos_opcoes)}"
+            if not opcoes:
+                # Discord exige ao menos uma opção: deixa o menu desabilitado
+                self.add_item(discord.ui.Select(
+                    placeholder=f"Tudo registrado! 🥳 ({parte})", custom_id=f"{PREFIXO_ID}:resumo:{n}",
+                    options=[discord.SelectOption(label="Tudo registrado!", value="-")], disabled=True
+                ))
+                continue
+            self.add_item(discord.ui.Select(
+                placeholder=f"Marque as tarefas que você finalizou ({parte})",
+                custom_id=f"{PREFIXO_ID}:resumo:{n}",
+                min_values=1, max_values=len(opcoes), options=opcoes
+            ))
+
+    @classmethod
+    def de_pendencias(cls, pendencias):
+        opcoes = opcoes_resumo(pendencias)
+        return cls([opcoes[i:i + OPCOES_POR_MENU] for i in range(0, len(opcoes), OPCOES_POR_MENU)])
+
+async def confirmar_tarefa(interaction, row_index, tarefa, fonte=None):
+    """Botão 'Sim, finalizei!': grava data + status e desabilita os botões."""
+    await interaction.response.defer(ephemeral=True, invisible=False)
+    
+    # --- Lógica para atualizar o Google Sheets ---
+    log_channel = interaction.client.get_channel(LOG_CHANNEL_ID)
+    
+    try:
+        # Chama a função de escrita, que se conecta ao Sheets e faz a alteração
+        # numa thread do pool, sem bloquear o gateway.
+        await atualizar_status_sheets_async(
+            row_index=row_index, 
+            tarefa=tarefa, 
+            novo_status='FALSE', # Seta o status para concluído
+            fonte=fonte # Planilha/aba de onde veio a pendência
+        )
         
-        # --- Lógica para atualizar o Google Sheets ---
-        pendencia = self.pendencia
-        log_channel = interaction.client.get_channel(LOG_CHANNEL_ID)
+        # Loga o sucesso no canal do Discord
+        if log_channel:
+             await log_channel.send(f"✅ Tarefa concluída registrada: **{tarefa}** (linha {row_index}) por **{interaction.user}**.")
         
-        try:
-            row_index = pendencia.get("row_index")
-            tarefa = pendencia.get("tarefa")
-            
-            # Chama a função de escrita, que se conecta ao Sheets e faz a alteração.
-            atualizar_status_sheets(
-                row_index=row_index, 
-                tarefa=tarefa, 
-                novo_status='FALSE' # Seta o status para concluído
-            )
-            
-            # Loga o sucesso no canal do Discord
-            if log_channel:
-                 await log_channel.send(f"✅ Tarefa concluída registrada: **{tarefa}** de **{pendencia.get('curso')}** por **{pendencia.get('pessoa')}**.")
-            
-        except Exception as e:
-            # Loga o erro no console e no canal do Discord
-            print(f"[ERRO Sheets] Falha ao atualizar planilha: {e}")
-            if log_channel:
-                 await log_channel.send(f"⚠️ **ERRO DE ATUALIZAÇÃO SHEETS** para {pendencia.get('pessoa')} na tarefa **{pendencia.get('tarefa')}**: `{e}`")
-            # Envia mensagem de erro ao usuário (ephemeral)
-            await interaction.followup.send(f"⚠️ Erro ao registrar a conclusão na planilha! Avise o administrador. (Detalhe: `{e}`)", ephemeral=True)
-            return # Sai da função para que os botões não sejam desabilitados se a gravação falhou.
-            
-        for item in self.children:
-            item.disabled = True
-        await interaction.message.edit(view=self)
+    except Exception as e:
+        # Loga o erro no console e no canal do Discord
+        log.error("Falha ao atualizar planilha: %s", e)
+        if log_channel:
+             await log_channel.send(f"⚠️ **ERRO DE ATUALIZAÇÃO SHEETS** para {interaction.user} na tarefa **{tarefa}** (linha {row_index}): `{e}`")
+        # Envia mensagem de erro ao usuário (ephemeral)
+        await interaction.followup.send(f"⚠️ Erro ao registrar a conclusão na planilha! Avise o administrador. (Detalhe: `{e}`)", ephemeral=True)
+        return # Sai da função para que os botões não sejam desabilitados se a gravação falhou.
         
-        await interaction.followup.send(MSG_PARABENS, ephemeral=True)
+    await interaction.message.edit(view=TaskView(row_index, tarefa, desabilitado=True, fonte=fonte))
+    
+    await interaction.followup.send(MSG_PARABENS, ephemeral=True)
+
+async def adiar_tarefa(interaction, row_index, tarefa, fonte=None):
+    """Botão 'Ainda não': só desabilita os botões e encoraja."""
+    await interaction.response.defer(ephemeral=True, invisible=False)
+    await interaction.message.edit(view=TaskView(row_index, tarefa, desabilitado=True, fonte=fonte))
+    await interaction.followup.send(MSG_ENCORAJAMENTO, ephemeral=True)
+
+async def confirmar_resumo(interaction, chaves):
+    """Menu do resumo: grava cada tarefa escolhida e tira do menu as que deram certo."""
+    await interaction.response.defer(ephemeral=True, invisible=False)
+    log_channel = interaction.client.get_channel(LOG_CHANNEL_ID)
+    escolhidas = [ler_chave_compacta(c) for c in chaves]
 
-    @discord.ui.button(label="Ainda não", style=discord.ButtonStyle.danger)
-    async def nao_callback(self, button: discord.ui.Button, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True, invisible=False)
-        for item in self.children:
-            item.disabled = True
-        await interaction.message.edit(view=self)
-        await interaction.followup.send(MSG_ENCORAJAMENTO, ephemeral=True)
+    # Todas vão para a fila de escrita juntas e saem num único batch_update
+    resultados = await asyncio.gather(
+        *(
+            atualizar_status_sheets_async(row_index=row_index, tarefa=tarefa, novo_status='FALSE', fonte=fonte)
+            for row_index, tarefa, fonte in escolhidas
+        ),
+        return_exceptions=True
+    )
+
+    concluidas = set()
+    erros = []
+    for chave, (row_index, tarefa, _), resultado in zip(chaves, escolhidas, resultados):
+        if isinstance(resultado, Exception):
+            log.error("Falha ao atualizar planilha: %s", resultado)
+            erros.append((row_index, tarefa, resultado))
+        else:
+            concluidas.add(chave)
+            if log_channel:
+                await log_channel.send(f"✅ Tarefa concluída registrada: **{tarefa}** (linha {row_index}) por **{interaction.user}**.")
+
+    if log_channel:
+        for row_index, tarefa, e in erros:
+            await log_channel.send(f"⚠️ **ERRO DE ATUALIZAÇÃO SHEETS** para {interaction.user} na tarefa **{tarefa}** (linha {row_index}): `{e}`")
+
+    # Tira do menu o que já foi registrado (as opções vêm da própria mensagem)
+    if concluidas:
+        blocos = [
+            [o for o in menu.options if o.value not in concluidas and o.value != "-"]
+            for linha in interaction.message.components
+            for menu in linha.children
+        ]
+        await interaction.message.edit(view=ResumoView(blocos))
+
+    if erros:
+        await interaction.followup.send(f"⚠️ Erro ao registrar {len(erros)} tarefa(s) na planilha! Avise o administrador. (Detalhe: `{erros[0][2]}`)", ephemeral=True)
+    if concluidas:
+        await interaction.followup.send(MSG_PARABENS, ephemeral=True)
 
 intents = discord.Intents.default()
 bot = discord.Bot(intents=intents, auto_sync_commands=False) 
+despachante = DespachanteDM()
+resolvedor = ResolvedorDestinatarios(bot)
+lembretes = EstadoLembretes()
+
+@bot.listen("on_interaction")
+async def tratar_componentes(interaction: discord.Interaction):
+    """Handler único de todos os botões/menus do bot, registrado na inicialização."""
+    if interaction.type != discord.InteractionType.component:
+        return
+    custom_id = (interaction.data or {}).get("custom_id", "")
+    if not custom_id.startswith(f"{PREFIXO_ID}:"):
+        return
+
+    _, acao, *resto = custom_id.split(":", 2)
+    try:
+        if acao == "sim":
+            await confirmar_tarefa(interaction, *ler_chave_compacta(resto[0]))
+        elif acao == "nao":
+            await adiar_tarefa(interaction, *ler_chave_compacta(resto[0]))
+        elif acao == "resumo":
+            await confirmar_resumo(interaction, interaction.data.get("values", []))
+    except (ValueError, IndexError) as e:
+        log.error("Botão com custom_id inválido '%s': %s", custom_id, e)
 
 @bot.event
 async def on_ready():
-    print(f"Bot conectado como {bot.user}")
+    log.info("Bot conectado como %s", bot.user)
     try:
-        print("Sincronizando comandos com o servidor...")
+        log.info("Sincronizando comandos com o servidor...")
         await bot.sync_commands(guild_ids=[GUILD_ID])
-        print("Comandos sincronizados.")
+        log.info("Comandos sincronizados.")
     except discord.errors.Forbidden:
-        print("--- ERRO DE PERMISSÃO (50001) ---")
-        print("Verifique as permissões 'bot' e 'applications.commands' ao convidar.")
+        log.error("Erro de permissão (50001) ao sincronizar comandos. Verifique as permissões 'bot' e 'applications.commands' ao convidar.")
     except Exception as e:
-        print(f"ERRO ao sincronizar comandos: {e}")
-    # print("Iniciando a tarefa agendada...") # Desabilitado para teste
+        log.error("Erro ao sincronizar comandos: %s", e)
+    # log.info("Iniciando a tarefa agendada...") # Desabilitado para teste
     # run_daily_check.start() # Desabilitado para teste
-    print("Bot pronto. Use o comando /verificar para teste manual.")
+    try:
+        metricas.iniciar_servidor_http()
+    except OSError as e:
+        log.error("Não foi possível abrir o endpoint de métricas na porta %s. Detalhe: %s", metricas.METRICAS_PORTA, e)
+    if AQUECER_IMPORTACOES:
+        asyncio.get_running_loop().run_in_executor(None, importacao_tardia.aquecer)
+    # Índice das consultas já na partida (do snapshot em disco, se recente), sem enviar DMs
+    if INDICE_ATUALIZAR_MINUTOS > 0:
+        if not atualizar_indice_periodico.is_running():
+            atualizar_indice_periodico.change_interval(minutes=INDICE_ATUALIZAR_MINUTOS)
+            atualizar_indice_periodico.start()
+    elif indice_pendencias.atual() is None:
+        asyncio.ensure_future(atualizar_indice())
+    log.info("Bot pronto. Use o comando /verificar para teste manual.")
+
+async def resolver_destinatario(alvo_id):
+    """Destino (usuário ou canal) do ID, vindo do cache do resolvedor."""
+    destinatario = await resolvedor.resolver(alvo_id)
+    if not destinatario:
+        raise Exception(f"ID {alvo_id} não corresponde a usuário nem canal válido.")
+    return destinatario
+
+async def enviar_para(destinatario, nome_pessoa, msg, view, assunto):
+    """Envia a mensagem como DM (usuário) ou no canal do grupo."""
+    if isinstance(destinatario, discord.User):
+        await destinatario.send(msg, view=view)
+        log.debug("DM enviada para %s (%s) sobre %s", destinatario.name, nome_pessoa, assunto)
+    elif isinstance(destinatario, (discord.TextChannel, discord.Thread)):
+        await destinatario.send(f"**{nome_pessoa}**, pendência encontrada! 📋\n\n" + msg, view=view)
+        log.debug("Mensagem enviada no canal '%s' para grupo '%s' sobre %s", destinatario.name, nome_pessoa, assunto)
+    else:
+        raise Exception("Destino não suportado para envio.")
+
+async def enviar_pendencia(envio):
+    """Envia a cobrança (alvo_id, pendência) com os botões Sim/Não."""
+    alvo_id, p = envio
+    nome_pessoa = p.pessoa
+    destinatario = await resolver_destinatario(alvo_id)
+    msg = criar_mensagem_pendencia(
+        pessoa=nome_pessoa,
+        curso=p.curso,
+        tarefa=p.tarefa,
+        dia=p.dia,
+        dias_atraso=p.dias_atraso
+    )
+    view = TaskView(p.row_index, p.tarefa, fonte=p.fonte)
+    await enviar_para(destinatario, nome_pessoa, msg, view, f"'{p.tarefa}'")
+
+async def enviar_resumo(envio):
+    """Envia o resumo (alvo_id, (nome, [pendências])) com os menus de tarefas."""
+    alvo_id, (nome_pessoa, pendencias) = envio
+    destinatario = await resolver_destinatario(alvo_id)
+    msg = criar_mensagem_resumo(nome_pessoa, pendencias)
+    await enviar_para(destinatario, nome_pessoa, msg, ResumoView.de_pendencias(pendencias), f"{len(pendencias)} tarefa(s) (resumo)")
+
+def agrupar_resumos(pendencias):
+    """
+    Agrupa as pendências por pessoa (sem repetir curso/tarefa), as mais atrasadas primeiro
+    e as demais na ordem em que aparecem.
+    Quem tem mais tarefas do que cabe numa mensagem recebe mais de um resumo.
+    """
+    por_pessoa = {}
+    vistos = set()
+    for p in priorizar_pendencias(pendencias):
+        chave = (p.pessoa, p.fonte, p.curso, p.tarefa)
+        if chave in vistos:
+            continue
+        vistos.add(chave)
+        por_pessoa.setdefault(p.pessoa, []).append(p)
+
+    limite = OPCOES_POR_MENU * MENUS_POR_MENSAGEM
+    return [
+        (pessoa, lista[i:i + limite])
+        for pessoa, lista in por_pessoa.items()
+        for i in range(0, len(lista), limite)
+    ]
 
-async def verificar_pendencias():
-    """Função principal que busca pendências e envia DMs."""
-    print(f"\n[{datetime.now()}] --- RODANDO VERIFICAÇÃO DE PENDÊNCIAS ---")
+# Verificação em andamento (uma por vez) e o resultado da última concluída
+_verificacao_atual = None    # (Task, origem, iniciada_em)
+_ultima_verificacao = None   # (concluida_em, relatório)
+
+def verificacao_em_andamento():
+    """Se há uma verificação rodando agora."""
+    return _verificacao_atual is not None and not _verificacao_atual[0].done()
+
+async def _avisar_log(msg):
+    log_channel = bot.get_channel(LOG_CHANNEL_ID)
+    if log_channel:
+        try:
+            await log_channel.send(msg)
+        except Exception as e:
+            log.error("Falha ao avisar no canal de log: %s", e)
+
+async def verificar_pendencias(origem="agendada", idade_maxima=None):
+    """
+    Função principal que busca pendências e envia DMs; retorna o relatório da verificação.
+    Uma verificação por vez: quem chama com uma já em andamento se junta a ela e recebe
+    o mesmo relatório. Com `idade_maxima` (padrão VERIFICACAO_IDADE_MAXIMA) > 0, uma
+    verificação concluída há no máximo esse tanto de segundos é reaproveitada.
+    """
+    global _verificacao_atual
+    idade_maxima = VERIFICACAO_IDADE_MAXIMA if idade_maxima is None else idade_maxima
+
+    if verificacao_em_andamento():
+        tarefa, origem_atual, iniciada_em = _verificacao_atual
+        log.info("Verificação (%s) juntou-se à que está em andamento (%s).", origem, origem_atual)
+        metricas.incrementar('verificacoes', modo='juntou')
+        await _avisar_log(
+            f"⏳ Verificação pedida ({origem}) juntou-se à que já está em andamento "
+            f"({origem_atual}, iniciada há {time_mod.monotonic() - iniciada_em:.0f}s)."
+        )
+        return await asyncio.shield(tarefa)
+
+    if idade_maxima > 0 and _ultima_verificacao and time_mod.monotonic() - _ultima_verificacao[0] <= idade_maxima:
+        idade = time_mod.monotonic() - _ultima_verificacao[0]
+        log.info("Verificação (%s) reaproveitou o resultado de %.0fs atrás.", origem, idade)
+        metricas.incrementar('verificacoes', modo='reaproveitou')
+        await _avisar_log(f"♻️ Verificação pedida ({origem}) reaproveitou a concluída há {idade:.0f}s (sem nova leitura).")
+        return _ultima_verificacao[1]
+
+    # Cria a tarefa antes de qualquer await: quem chegar depois já a encontra
+    tarefa = asyncio.ensure_future(_rodar_verificacao())
+    _verificacao_atual = (tarefa, origem, time_mod.monotonic())
+    metricas.incrementar('verificacoes', modo='iniciou')
+    await _avisar_log(f"🔎 Verificação iniciada ({origem}).")
+    return await asyncio.shield(tarefa)
+
+async def _rodar_verificacao():
+    """Uma verificação completa (cronometrada como 'verificacao')."""
+    global _ultima_verificacao
+    with metricas.cronometrar('verificacao'):
+        relatorio = await _executar_verificacao()
+    _ultima_verificacao = (time_mod.monotonic(), relatorio)
+    try:
+        metricas.salvar_arquivo()
+    except OSError as e:
+        log.error("Não foi possível gravar o arquivo de métricas. Detalhe: %s", e)
+    return relatorio
+
+async def _executar_verificacao():
+    log.info("--- RODANDO VERIFICAÇÃO DE PENDÊNCIAS ---")
     log_channel = bot.get_channel(LOG_CHANNEL_ID)
     if not log_channel:
-        print(f"[ERRO CRÍTICO] Não foi possível encontrar o CANAL DE LOG com ID: {LOG_CHANNEL_ID}. Logs de erro não serão enviados.")
+        log.critical("Não foi possível encontrar o CANAL DE LOG com ID: %s. Logs de erro não serão enviados.", LOG_CHANNEL_ID)
     
-    sucessos_dm = 0
-    falhas_dm = 0
     erros_map = []
     pendencias_total = 0
 
     try:
-        pendencias = encontrar_pendencias()
+        fontes_lidas = set()
+        pendencias = await encontrar_pendencias_async(fontes_lidas=fontes_lidas)
         pendencias_total = len(pendencias)
+        loop = asyncio.get_running_loop()
+        # Índices para os comandos de consulta (montados fora do event loop, trocados de uma vez)
+        await loop.run_in_executor(None, indice_pendencias.publicar, pendencias)
+
+        # Esquece o que foi concluído em cada fonte lida (inclusive as que zeraram as
+        # pendências): se a tarefa reabrir, volta a ser cobrada como nova
+        try:
+            await loop.run_in_executor(None, lembretes.esquecer_resolvidas, pendencias, fontes_lidas)
+        except sqlite3.Error as e:
+            log.error("Não foi possível limpar o estado de lembretes. Detalhe: %s", e)
         
         if not pendencias:
-            print("Nenhuma pendência encontrada.")
+            log.info("Nenhuma pendência encontrada.", extra=RESUMO)
+            msg_log = "✅ Verificação concluída. Nenhuma pendência encontrada!"
             if log_channel:
-                await log_channel.send("✅ Verificação concluída. Nenhuma pendência encontrada!")
-            return
+                await log_channel.send(msg_log)
+            return msg_log
             
-        print(f"Encontradas {pendencias_total} pendências. Tentando enviar DMs...")
-        
-        for p in pendencias:
-            nome_pessoa = p.get("pessoa")
-            user_id = USER_MAP.get(nome_pessoa)
+        log.info("Encontradas %d pendências. Tentando enviar DMs...", pendencias_total)
 
-            if not user_id:
+        # Quem não está no USER_MAP fica de fora do envio (e vai para o relatório)
+        # As mais atrasadas (pelo cronograma de dependências) são enviadas primeiro
+        enviaveis = []
+        for p in priorizar_pendencias(pendencias):
+            nome_pessoa = p.pessoa
+            if not USER_MAP.get(nome_pessoa):
                 if nome_pessoa not in erros_map:
-                    print(f"[AVISO] '{nome_pessoa}' encontrado na planilha, mas não no USER_MAP. DM não será enviada.")
+                    log.warning("'%s' encontrado na planilha, mas não no USER_MAP. DM não será enviada.", nome_pessoa)
                     erros_map.append(nome_pessoa)
                 continue
+            enviaveis.append(p)
 
-            # Se for lista, pega o primeiro
-            if isinstance(user_id, list):
-                user_id = user_id[0]
+        # Só cobra o que é novo, mudou ou já passou do intervalo de repetição. No modo
+        # resumo o estado só escolhe quem recebe: essa pessoa recebe a lista inteira
+        try:
+            a_cobrar, contagem = await loop.run_in_executor(None, lembretes.selecionar, enviaveis)
+        except sqlite3.Error as e:
+            log.error("Estado de lembretes indisponível, todas as pendências serão cobradas. Detalhe: %s", e)
+            contagem = None
+        else:
+            if MODO_RESUMO:
+                pessoas = {p.pessoa for p in a_cobrar}
+                enviaveis = [p for p in enviaveis if p.pessoa in pessoas]
+            else:
+                enviaveis = a_cobrar
+        if contagem:
+            log.info(
+                "Lembretes: %d nova(s), %d alterada(s), %d repetida(s); %d sem mudança não reenviada(s).",
+                contagem['novas'], contagem['alteradas'], contagem['repetidas'], contagem['em_dia'], extra=RESUMO
+            )
 
-            try:
-                # --- Tentativa de DM ---
-                msg = criar_mensagem_pendencia(
-                    pessoa=nome_pessoa,
-                    curso=p.get("curso"),
-                    tarefa=p.get("tarefa"),
-                    dia=p.get("dia")
-                )
-                view = TaskView(pendencia=p)
-
-                destinatario = None
-
-                # Tenta identificar o tipo de destino
-                user = bot.get_user(user_id)
-                if not user:
-                    # Pode ser canal? 
-                    channel = bot.get_channel(user_id)
-                    if channel:
-                        destinatario = channel
-                    else:
-                        # Se não encontrou como canal, tenta buscar como usuário
-                        try:
-                            user = await bot.fetch_user(user_id)
-                            destinatario = user
-                        except:
-                            destinatario = None
-                else:
-                    destinatario = user
-
-                if not destinatario:
-                    raise Exception("ID não corresponde a usuário nem canal válido.")
-
-                # --- Envio ---
-                if isinstance(destinatario, discord.User):
-                    await destinatario.send(msg, view=view)
-                    print(f"  -> DM enviada para {destinatario.name} ({nome_pessoa}) sobre '{p.get('tarefa')}'")
-                elif isinstance(destinatario, (discord.TextChannel, discord.Thread)):
-                    await destinatario.send(f"**{nome_pessoa}**, pendência encontrada! 📋\n\n" + msg, view=view)
-                    print(f"  -> Mensagem enviada no canal '{destinatario.name}' para grupo '{nome_pessoa}' sobre '{p.get('tarefa')}'")
-                else:
-                    raise Exception("Destino não suportado para envio.")
-
-                sucessos_dm += 1
-                await asyncio.sleep(1.5)
-
-            except discord.errors.Forbidden:
-                print(f"[ERRO DM] Falha ao enviar para {nome_pessoa} (ID: {user_id}). Sem permissão ou DMs bloqueadas.")
-                falhas_dm += 1
-            except Exception as e:
-                print(f"[ERRO ENVIO] Erro ao enviar para {nome_pessoa} (ID: {user_id}): {e}")
-                falhas_dm += 1
-
-            nome_pessoa = p.get("pessoa")
-            user_id = USER_MAP.get(nome_pessoa)
-            
-            if not user_id:
-                if nome_pessoa not in erros_map:
-                    print(f"[AVISO] '{nome_pessoa}' encontrado na planilha, mas não no USER_MAP. DM não será enviada.")
-                    erros_map.append(nome_pessoa)
-                continue
+        # Resolve todos os destinatários distintos de uma vez, antes do envio
+        await resolvedor.pre_carregar(USER_MAP[nome] for nome in {p.pessoa for p in enviaveis})
 
-            # CRÍTICO: Se o user_id for uma lista, use o primeiro ID para o DM
-            if isinstance(user_id, list):
-                user_id = user_id[0]
+        # Entradas com vários IDs (ex: grupos) recebem uma cópia em cada ID
+        if MODO_RESUMO:
+            resumos = agrupar_resumos(enviaveis)
+            log.info("Modo resumo: %d pendências agrupadas em %d mensagem(ns).", len(enviaveis), len(resumos))
+            relatorio = await despachante.despachar(
+                [(alvo_id, r) for r in resumos for alvo_id in ids_destino(USER_MAP[r[0]])],
+                enviar_resumo,
+                chave=lambda e: (e[0], e[1][0], e[1][1][0].fonte, e[1][1][0].curso, e[1][1][0].tarefa),
+                descrever=lambda e: f"{e[1][0]} (ID {e[0]}, resumo com {len(e[1][1])} tarefa(s))"
+            )
+        else:
+            relatorio = await despachante.despachar(
+                [(alvo_id, p) for p in enviaveis for alvo_id in ids_destino(USER_MAP[p.pessoa])],
+                enviar_pendencia,
+                chave=lambda e: (e[0], e[1].pessoa, e[1].fonte, e[1].curso, e[1].tarefa),
+                descrever=lambda e: f"{e[1].pessoa} (ID {e[0]}, tarefa '{e[1].tarefa}')"
+            )
+                
+        log.info(
+            "Envio de DMs concluído: %d enviadas, %d falhas em %.1fs.",
+            relatorio.enviados, relatorio.falhas, relatorio.duracao, extra=RESUMO
+        )
 
+        # Marca como lembradas as pendências entregues a pelo menos um destino
+        if contagem is not None:
+            if MODO_RESUMO:
+                entregues = [p for _, (_, lista) in relatorio.entregues for p in lista]
+            else:
+                entregues = [p for _, p in relatorio.entregues]
             try:
-                user = bot.get_user(user_id) or await bot.fetch_user(user_id)
-                if not user:
-                    raise Exception("Usuário não encontrado com o ID fornecido.")
-                
-                # Cria a mensagem e a view
-                msg = criar_mensagem_pendencia(
-                    pessoa=nome_pessoa,
-                    curso=p.get("curso"),
-                    tarefa=p.get("tarefa"),
-                    dia=p.get("dia")
-                )
-                # Passa a pendência COMPLETA para a View, que contém o 'row_index'
-                view = TaskView(pendencia=p) 
-                
-                # Envia a DM
-                await user.send(msg, view=view)
-                print(f"  -> DM enviada para {user.name} ({nome_pessoa}) sobre '{p.get('tarefa')}'")
-                sucessos_dm += 1
-                
-                # Pausa pequena para não sobrecarregar a API do Discord
-                await asyncio.sleep(1.5) 
-
-            except discord.errors.Forbidden:
-                print(f"[ERRO DM] Falha ao enviar DM para {nome_pessoa} (ID: {user_id}). O usuário pode ter bloqueado o bot ou desabilitado DMs do servidor.")
-                falhas_dm += 1
-            except Exception as e:
-                print(f"[ERRO DM] Erro inesperado ao enviar DM para {nome_pessoa} (ID: {user_id}): {e}")
-                falhas_dm += 1
-                
-        print("Envio de DMs concluído.")
+                await loop.run_in_executor(None, lembretes.registrar_envios, entregues)
+            except sqlite3.Error as e:
+                log.error("Não foi possível gravar o estado de lembretes. Detalhe: %s", e)
 
-        # Envia um resumo para o canal de log
+        # Monta o relatório (vai para o canal de log e para quem pediu a verificação)
+        msg_log = f"📊 **Relatório de Verificação** ({datetime.now().strftime('%d/%m/%Y %H:%M')})\n"
+        msg_log += f"- Pendências encontradas na planilha: {pendencias_total}\n"
+        atrasadas = [p.dias_atraso for p in pendencias if p.dias_atraso > 0]
+        if atrasadas:
+            msg_log += f"- Atrasadas pelo cronograma: {len(atrasadas)} (maior atraso: {max(atrasadas)} dia(s))\n"
+        if contagem:
+            msg_log += (
+                f"- Lembretes: {contagem['novas']} nova(s), {contagem['alteradas']} alterada(s), "
+                f"{contagem['repetidas']} repetida(s); {contagem['em_dia']} sem mudança não reenviada(s)\n"
+            )
+        msg_log += f"- DMs enviadas com sucesso: {relatorio.enviados}\n"
+        msg_log += f"- Falhas ao enviar DM: {relatorio.falhas}\n"
+        if MODO_RESUMO:
+            msg_log += f"- Modo resumo: {len(enviaveis)} pendências em {len(resumos)} mensagem(ns)\n"
+        if relatorio.duplicados:
+            msg_log += f"- Pendências repetidas ignoradas: {relatorio.duplicados}\n"
+        msg_log += f"- Tempo de envio: {relatorio.duracao:.1f}s ({relatorio.vazao:.1f} msg/s, {relatorio.rate_limits} rate limit(s))\n"
+        if erros_map:
+            msg_log += f"- Nomes na planilha sem ID no USER_MAP: {', '.join(erros_map)}\n"
         if log_channel:
-            msg_log = f"📊 **Relatório de Verificação** ({datetime.now().strftime('%d/%m/%Y %H:%M')})\n"
-            msg_log += f"- Pendências encontradas na planilha: {pendencias_total}\n"
-            msg_log += f"- DMs enviadas com sucesso: {sucessos_dm}\n"
-            msg_log += f"- Falhas ao enviar DM: {falhas_dm}\n"
-            if erros_map:
-                msg_log += f"- Nomes na planilha sem ID no USER_MAP: {', '.join(erros_map)}\n"
             await log_channel.send(msg_log)
+        return msg_log
 
     except Exception as e:
-        print(f"[ERRO GERAL] Erro ao executar a verificação: {e}")
+        log.exception("Erro ao executar a verificação: %s", e)
+        msg_log = f"⚠️ **Erro Crítico** ao processar a verificação: `{e}`"
         if log_channel:
             try:
-                await log_channel.send(f"⚠️ **Erro Crítico** ao processar a verificação: `{e}`")
+                await log_channel.send(msg_log)
             except:
                 pass 
+        return msg_log
 
 # --- Tarefa Agendada ---
 @tasks.loop(time=SCHEDULED_TIMES)
 async def run_daily_check():
     """Loop que roda a verificação nos horários agendados."""
-    await verificar_pendencias()
+    await verificar_pendencias(origem="agendada")
+
+async def atualizar_indice():
+    """Lê as pendências (podendo usar o snapshot em disco) e refaz o índice das consultas, sem enviar DMs."""
+    if verificacao_em_andamento():
+        return  # a verificação em andamento já publica o índice ao terminar a leitura
+    try:
+        pendencias = await encontrar_pendencias_async(usar_cache=True)
+        await asyncio.get_running_loop().run_in_executor(None, indice_pendencias.publicar, pendencias)
+    except Exception as e:
+        log.error("Não foi possível atualizar o índice de pendências. Detalhe: %s", e)
+
+@tasks.loop(minutes=30)
+async def atualizar_indice_periodico():
+    """Mantém o índice de /pendencias atualizado entre as verificações (a 1ª volta roda na partida)."""
+    await atualizar_indice()
 
 # --- Comando Manual (para testes) ---
 @bot.slash_command(guild_ids=[GUILD_ID], description="Força uma verificação de pendências e envia DMs.") 
@@ -298,27 +623,100 @@ async def verificar(ctx: discord.ApplicationContext):
         await ctx.respond("Você não tem permissão para usar este comando.", ephemeral=True)
         return
         
-    await ctx.respond("Ok, iniciando uma verificação manual e envio de DMs...", ephemeral=True)
-    await verificar_pendencias()
+    if verificacao_em_andamento():
+        await ctx.respond("Já há uma verificação em andamento; você vai receber o resultado dela.", ephemeral=True)
+    else:
+        await ctx.respond("Ok, iniciando uma verificação manual e envio de DMs...", ephemeral=True)
+    relatorio = await verificar_pendencias(origem=f"/verificar por {ctx.author}")
+    if relatorio:
+        await ctx.followup.send(relatorio[:LIMITE_CARACTERES], ephemeral=True)
+
+@bot.slash_command(name="metricas", guild_ids=[GUILD_ID], description="Mostra o tempo de cada etapa e os contadores do bot.")
+async def metricas_cmd(ctx: discord.ApplicationContext):
+    """Comando /metricas (só administradores): p50/p90/máx por etapa e contadores."""
+    if not ctx.author.guild_permissions.administrator:
+        await ctx.respond("Você não tem permissão para usar este comando.", ephemeral=True)
+        return
+
+    await ctx.respond(metricas.resumo_texto()[:LIMITE_CARACTERES], ephemeral=True)
+
+# --- Consultas (respondidas pelo índice em memória, sem ler a planilha) ---
+
+def _sugerir(campo):
+    """Autocompletar de pessoa/curso com os nomes do índice atual."""
+    def sugerir(ctx: discord.AutocompleteContext):
+        indice = indice_pendencias.atual()
+        if indice is None:
+            return []
+        return indice.sugestoes(getattr(indice, campo), ctx.value or "")
+    return sugerir
+
+def nomes_do_usuario(user_id):
+    """Nomes da planilha ligados ao ID no USER_MAP (o caminho inverso do envio das DMs)."""
+    return [nome for nome, alvo in USER_MAP.items() if user_id in ids_destino(alvo)]
+
+@bot.slash_command(name="pendencias", guild_ids=[GUILD_ID], description="Consulta as pendências da última verificação (sem ler a planilha).")
+async def pendencias_cmd(
+    ctx: discord.ApplicationContext,
+    pessoa: discord.Option(str, "Responsável (nome ou parte dele)", required=False, autocomplete=_sugerir('por_pessoa')),
+    curso: discord.Option(str, "Curso (nome ou parte dele)", required=False, autocomplete=_sugerir('por_curso')),
+    tarefa: discord.Option(str, "Etapa", required=False, choices=[t.strip() for t in TAREFAS_PRINCIPAIS]),
+    ate: discord.Option(str, "Só as com data esperada até este dia (dd/mm)", required=False),
+):
+    """Comando /pendencias: filtra por pessoa, curso, etapa e data, das mais atrasadas para as demais."""
+    indice = indice_pendencias.atual()
+    if indice is None:
+        await ctx.respond(MSG_SEM_INDICE, ephemeral=True)
+        return
+
+    data_limite = None
+    if ate:
+        data_limite = interpretar_data(ate)
+        if data_limite is None:
+            await ctx.respond(f"Não entendi a data '{ate}'. Use dd/mm (ex: 15/11).", ephemeral=True)
+            return
+
+    encontradas = indice.buscar(pessoa=pessoa, curso=curso, tarefa=tarefa, ate=data_limite)
+    filtros = [f"{nome} '{valor}'" for nome, valor in (("pessoa", pessoa), ("curso", curso), ("etapa", tarefa), ("até", ate)) if valor]
+    titulo = f"🔎 Pendências ({', '.join(filtros)})" if filtros else "🔎 Todas as pendências"
+    await ctx.respond(criar_mensagem_consulta(titulo, encontradas, indice), ephemeral=True)
+
+@bot.slash_command(name="minhas_pendencias", guild_ids=[GUILD_ID], description="Mostra as suas tarefas em aberto (da última verificação).")
+async def minhas_pendencias_cmd(ctx: discord.ApplicationContext):
+    """Comando /minhas_pendencias: as pendências dos nomes ligados ao seu ID no USER_MAP."""
+    nomes = nomes_do_usuario(ctx.author.id)
+    if not nomes:
+        await ctx.respond("Seu usuário não está ligado a nenhum nome da planilha. Fale com um administrador.", ephemeral=True)
+        return
+    indice = indice_pendencias.atual()
+    if indice is None:
+        await ctx.respond(MSG_SEM_INDICE, ephemeral=True)
+        return
+
+    # Só o nome exato: 'Ana' não pode ver as tarefas de 'Mariana'
+    encontradas = [p for nome in nomes for p in indice.buscar(pessoa=nome, exato=True)]
+    await ctx.respond(criar_mensagem_consulta(f"📋 Suas pendências ({', '.join(nomes)})", encontradas, indice), ephemeral=True)
 
 # --- Inicia o Bot ---
 if __name__ == "__main__":
+    configurar_logging()
+
     # Garante que todas as bibliotecas necessárias estão instaladas antes de iniciar o bot
-    try:
-        import dotenv
-        import pycord
-        import pandas
-        import gspread
-        import google.oauth2.service_account 
-    except ImportError as e:
-        print(f"--- ERRO DE BIBLIOTECA ---")
-        print(f"Biblioteca faltando: {e.name}")
-        print("Rode: pip install -r requirements.txt")
+    # (só localiza os pacotes, sem importá-los: os pesados carregam depois, sob demanda)
+    faltando = []
+    for modulo in ['dotenv', 'discord', 'pandas', 'gspread', 'google.oauth2', 'pyarrow']:
+        try:
+            encontrado = importlib.util.find_spec(modulo) is not None
+        except ModuleNotFoundError:
+            encontrado = False
+        if not encontrado:
+            faltando.append(modulo)
+    if faltando:
+        log.critical("Biblioteca faltando: %s. Rode: pip install -r requirements.txt", ', '.join(faltando))
         exit()
         
     if not BOT_TOKEN or not LOG_CHANNEL_ID or not GUILD_ID: 
-        print("--- ERRO DE CONFIGURAÇÃO ---")
-        print("Verifique se 'BOT_TOKEN', 'LOG_CHANNEL_ID' e 'GUILD_ID' estão no arquivo .env")
+        log.critical("Erro de configuração. Verifique se 'BOT_TOKEN', 'LOG_CHANNEL_ID' e 'GUILD_ID' estão no arquivo .env")
     else:
-        print("Iniciando o bot...")
+        log.info("Iniciando o bot...")
         bot.run(BOT_TOKEN)
\ No newline at end of file
@@ -0,0 +1,80 @@
+import json
+import os
+import time
+from importacao_tardia import tardio
+from log_config import obter_logger
+
+# pyarrow só é carregado quando o cache é lido ou gravado
+pa = tardio('pyarrow')
+pq = tardio('pyarrow.parquet')
+
+# --- Cache Local do Cronograma (Parquet) ---
+# Guarda o DataFrame montado por carregar_dataframe() num arquivo colunar compacto,
+# junto com a impressão digital do cabeçalho (para notar que a aba mudou de layout)
+# e o horário da leitura. O formato é versionado: arquivos de versão diferente
+# são ignorados e reconstruídos na próxima leitura pela rede.
+
+# Incrementar sempre que o conteúdo do arquivo ou do metadado mudar de formato
+VERSAO_CACHE = 3
+_CHAVE_META = b'botedu.cache'
+
+log = obter_logger('cache')
+
+def salvar_snapshot(caminho, df, layout):
+    """Grava o DataFrame + metadados (versão, horário, impressão digital do cabeçalho) de forma atômica."""
+    # Parquet não aceita nomes de coluna repetidos; a análise já usa só a primeira
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    meta = {
+        'versao': VERSAO_CACHE,
+        'gerado_em': time.time(),
+        'impressao_digital': layout.impressao_digital,
+    }
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    tabela = tabela.replace_schema_metadata({
+        **(tabela.schema.metadata or {}),
+        _CHAVE_META: json.dumps(meta).encode('utf-8'),
+    })
+
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    pq.write_table(tabela, temporario, compression='zstd')
+    os.replace(temporario, caminho)
+    log.info("Snapshot salvo em '%s' (%d linhas).", caminho, len(df))
+
+def ler_metadados(caminho):
+    """Lê só o metadado do arquivo (sem carregar os dados). None se ausente, corrompido ou de outra versão."""
+    try:
+        meta = json.loads(pq.read_schema(caminho).metadata[_CHAVE_META])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning("Cache '%s' ilegível, será reconstruído. Detalhe: %s", caminho, e)
+        return None
+
+    if meta.get('versao') != VERSAO_CACHE:
+        log.info("Cache '%s' na versão %s (atual: %d), será reconstruído.", caminho, meta.get('versao'), VERSAO_CACHE)
+        return None
+    return meta
+
+def idade_snapshot(meta):
+    """Idade do snapshot em segundos."""
+    return time.time() - meta['gerado_em']
+
+def carregar_snapshot(caminho, idade_maxima):
+    """Retorna (df, meta) se o cache existe, é da versão atual e tem no máximo `idade_maxima` segundos."""
+    meta = ler_metadados(caminho)
+    if meta is None or idade_snapshot(meta) > idade_maxima:
+        return None
+
+    df = pq.read_table(caminho).to_pandas()
+    log.info("Snapshot carregado de '%s' (%d linhas, %.0fs de idade).", caminho, len(df), idade_snapshot(meta))
+    return df, meta
+
+def descartar_snapshot(caminho):
+    """Apaga o snapshot (ex: o cabeçalho da aba mudou); não faz nada se ele não existe."""
+    try:
+        os.remove(caminho)
+        log.info("Snapshot '%s' descartado.", caminho)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,139 @@
+import os
+import random
+import threading
+import time
+from dotenv import load_dotenv
+from importacao_tardia import tardio
+from log_config import obter_logger
+import metricas
+
+gspread = tardio('gspread')
+
+# --- Cota da API do Google Sheets ---
+# O Sheets limita leituras e escritas por minuto, separadamente. Toda chamada ao
+# Sheets (abrir a planilha, get_all_values, get/batch_get, batch_update) passa
+# por aqui: cada tipo tem o seu balde de fichas, escritas interativas (cliques)
+# furam a fila das leituras em lote, e 429/5xx são repetidos com backoff
+# exponencial e jitter. Um 429 pausa o tipo inteiro, não só a chamada que o recebeu.
+load_dotenv()
+# Requisições por minuto de cada tipo (0 = sem limite local)
+SHEETS_LEITURAS_POR_MINUTO = int(os.getenv('SHEETS_LEITURAS_POR_MINUTO', '60'))
+SHEETS_ESCRITAS_POR_MINUTO = int(os.getenv('SHEETS_ESCRITAS_POR_MINUTO', '60'))
+# Quantas requisições de cada tipo podem sair de uma vez, antes de valer o ritmo por minuto
+SHEETS_RAJADA = int(os.getenv('SHEETS_RAJADA', '10'))
+# Tentativas por chamada em 429/5xx (ESCRITA_MAX_TENTATIVAS ainda é aceito)
+SHEETS_MAX_TENTATIVAS = int(os.getenv('SHEETS_MAX_TENTATIVAS', os.getenv('ESCRITA_MAX_TENTATIVAS', '5')))
+SHEETS_BACKOFF_BASE = 1.0   # segundos; dobra a cada tentativa
+SHEETS_BACKOFF_MAX = 32.0
+# Quota estourada (429) ou erro temporário do Google (5xx): vale tentar de novo
+STATUS_REPETIR = (429, 500, 502, 503, 504)
+
+LEITURA = 'leitura'
+ESCRITA = 'escrita'
+
+log = obter_logger('cota')
+
+class BaldeFichas:
+    """Balde de fichas: até `capacidade` requisições de uma vez, repostas a `por_minuto` por minuto."""
+
+    def __init__(self, por_minuto, capacidade):
+        self.taxa = por_minuto / 60.0
+        self.capacidade = max(1, min(capacidade, por_minuto)) if por_minuto else 0
+        self.fichas = float(self.capacidade)
+        self.atualizado_em = time.monotonic()
+
+    def espera(self, agora):
+        """Segundos até haver uma ficha (0 = já há; sempre 0 sem limite)."""
+        if not self.capacidade:
+            return 0.0
+        self.fichas = min(self.capacidade, self.fichas + (agora - self.atualizado_em) * self.taxa)
+        self.atualizado_em = agora
+        return 0.0 if self.fichas >= 1 else (1 - self.fichas) / self.taxa
+
+    def consumir(self):
+        if self.capacidade:
+            self.fichas -= 1
+
+class GerenciadorCota:
+    """
+    Controla as chamadas ao Sheets de todas as threads (leitores e fila de escrita).
+    Leituras esperam enquanto houver escrita aguardando a vez; um 429 pausa o
+    tipo que o recebeu pelo tempo do backoff.
+    """
+
+    def __init__(self, leituras_por_minuto=SHEETS_LEITURAS_POR_MINUTO, escritas_por_minuto=SHEETS_ESCRITAS_POR_MINUTO,
+                 rajada=SHEETS_RAJADA, max_tentativas=SHEETS_MAX_TENTATIVAS,
+                 backoff_base=SHEETS_BACKOFF_BASE, backoff_max=SHEETS_BACKOFF_MAX):
+        self.max_tentativas = max_tentativas
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._baldes = {
+            LEITURA: BaldeFichas(leituras_por_minuto, rajada),
+            ESCRITA: BaldeFichas(escritas_por_minuto, rajada),
+        }
+        self._condicao = threading.Condition()
+        self._aguardando = {LEITURA: 0, ESCRITA: 0}
+        self._pausa_ate = {LEITURA: 0.0, ESCRITA: 0.0}
+
+    def _adquirir(self, tipo):
+        """Bloqueia até o `tipo` ter ficha, sem pausa de 429 e (leituras) sem escrita na frente."""
+        inicio = time.monotonic()
+        with self._condicao:
+            self._aguardando[tipo] += 1
+            try:
+                while True:
+                    agora = time.monotonic()
+                    if tipo == LEITURA and self._aguardando[ESCRITA]:
+                        # Escrita na frente: espera ela sair (notify) ou um tempo curto
+                        self._condicao.wait(0.1)
+                        continue
+                    espera = max(self._pausa_ate[tipo] - agora, self._baldes[tipo].espera(agora))
+                    if espera <= 0:
+                        self._baldes[tipo].consumir()
+                        break
+                    self._condicao.wait(espera)
+            finally:
+                self._aguardando[tipo] -= 1
+                self._condicao.notify_all()
+
+        espera_total = time.monotonic() - inicio
+        metricas.observar(f'espera_cota_{tipo}', espera_total)
+        metricas.incrementar('sheets_requisicoes', tipo=tipo)
+        if espera_total > 1:
+            log.debug("Chamada de %s aguardou %.1fs pela cota do Sheets.", tipo, espera_total)
+
+    def _pausar(self, tipo, segundos):
+        with self._condicao:
+            self._pausa_ate[tipo] = max(self._pausa_ate[tipo], time.monotonic() + segundos)
+
+    def chamar(self, tipo, func, *args, **kwargs):
+        """Chama `func(*args, **kwargs)` dentro da cota do `tipo`, repetindo em 429/5xx."""
+        for tentativa in range(self.max_tentativas):
+            self._adquirir(tipo)
+            try:
+                return func(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                status = e.response.status_code
+                if status not in STATUS_REPETIR or tentativa == self.max_tentativas - 1:
+                    raise
+                espera = min(self.backoff_max, self.backoff_base * 2 ** tentativa) * random.uniform(0.5, 1.0)
+                log.warning(
+                    "HTTP %d do Sheets (%s). Nova tentativa em %.1fs (%d/%d)...",
+                    status, tipo, espera, tentativa + 1, self.max_tentativas
+                )
+                metricas.incrementar('sheets_retentativas', status=status, tipo=tipo)
+                if status == 429:
+                    # Quota: todo o tipo espera (a própria retentativa aguarda no _adquirir)
+                    self._pausar(tipo, espera)
+                else:
+                    time.sleep(espera)
+
+gerenciador = GerenciadorCota()
+
+def ler(func, *args, **kwargs):
+    """Leitura no Sheets (open_by_key, get_all_values, get, batch_get...) dentro da cota."""
+    return gerenciador.chamar(LEITURA, func, *args, **kwargs)
+
+def escrever(func, *args, **kwargs):
+    """Escrita no Sheets (batch_update...) dentro da cota, com prioridade sobre as leituras."""
+    return gerenciador.chamar(ESCRITA, func, *args, **kwargs)
@@ -0,0 +1,177 @@
+import discord
+import os
+import asyncio
+import time
+from dotenv import load_dotenv
+from log_config import obter_logger
+import metricas
+
+# --- Configuração ---
+load_dotenv()
+# Quantas mensagens podem estar sendo enviadas ao mesmo tempo
+DM_CONCORRENCIA = int(os.getenv('DM_CONCORRENCIA', '5'))
+# Tentativas por mensagem quando o Discord responde 429 mesmo após o controle do py-cord
+DM_MAX_TENTATIVAS = int(os.getenv('DM_MAX_TENTATIVAS', '3'))
+# Espera usada se o 429 não trouxer Retry-After (segundos)
+DM_ESPERA_PADRAO_429 = 5.0
+# Validade (segundos) do cache de destinatários: encontrados / não encontrados
+DESTINATARIOS_TTL = int(os.getenv('DESTINATARIOS_TTL', '3600'))
+DESTINATARIOS_TTL_NEGATIVO = int(os.getenv('DESTINATARIOS_TTL_NEGATIVO', '600'))
+
+log = obter_logger('despachante')
+
+class RelatorioDespacho:
+    """Contadores de uma execução do despachante (vão para o resumo no canal de log)."""
+
+    def __init__(self):
+        self.enviados = 0
+        self.falhas = 0
+        self.duplicados = 0
+        self.rate_limits = 0
+        self.entregues = []  # itens enviados com sucesso
+        self.inicio = time.monotonic()
+        self.duracao = 0.0
+
+    @property
+    def vazao(self):
+        """Mensagens enviadas por segundo."""
+        return self.enviados / self.duracao if self.duracao > 0 else 0.0
+
+def _retry_after(erro):
+    """Segundos pedidos pelo Discord no 429 (cabeçalho Retry-After ou corpo da resposta)."""
+    resposta = getattr(erro, 'response', None)
+    cabecalho = resposta.headers.get('Retry-After') if resposta is not None else None
+    try:
+        return float(cabecalho)
+    except (TypeError, ValueError):
+        return DM_ESPERA_PADRAO_429
+
+class DespachanteDM:
+    """
+    Envia as mensagens de uma verificação com concorrência limitada.
+    Os buckets de rate limit por rota ficam a cargo do cliente HTTP do py-cord (que
+    já espera o reset de cada bucket); se ainda assim vier um 429, a mensagem espera
+    o Retry-After e tenta de novo, em vez de uma pausa fixa entre todos os envios.
+    Cada chave é entregue no máximo uma vez por execução.
+    """
+
+    def __init__(self, concorrencia=DM_CONCORRENCIA, max_tentativas=DM_MAX_TENTATIVAS):
+        self.concorrencia = concorrencia
+        self.max_tentativas = max_tentativas
+
+    async def despachar(self, itens, enviar, chave, descrever=str):
+        """
+        Chama `await enviar(item)` para cada item de chave inédita.
+        `chave(item)` identifica a entrega; `descrever(item)` é usado nos logs de erro.
+        Retorna um RelatorioDespacho.
+        """
+        relatorio = RelatorioDespacho()
+        semaforo = asyncio.Semaphore(self.concorrencia)
+
+        vistos = set()
+        unicos = []
+        for item in itens:
+            k = chave(item)
+            if k in vistos:
+                relatorio.duplicados += 1
+                continue
+            vistos.add(k)
+            unicos.append(item)
+
+        async def _enviar_um(item):
+            async with semaforo:
+                for tentativa in range(1, self.max_tentativas + 1):
+                    try:
+                        await enviar(item)
+                        relatorio.enviados += 1
+                        relatorio.entregues.append(item)
+                        return
+                    except discord.errors.HTTPException as e:
+                        if e.status == 429 and tentativa < self.max_tentativas:
+                            relatorio.rate_limits += 1
+                            espera = _retry_after(e)
+                            log.warning("Rate limit do Discord ao enviar para %s. Nova tentativa em %.1fs...", descrever(item), espera)
+                            await asyncio.sleep(espera)
+                            continue
+                        if isinstance(e, discord.errors.Forbidden):
+                            log.error("Falha ao enviar DM para %s. Sem permissão ou DMs bloqueadas.", descrever(item))
+                        else:
+                            log.error("Erro ao enviar para %s: %s", descrever(item), e)
+                        relatorio.falhas += 1
+                        return
+                    except Exception as e:
+                        log.error("Erro ao enviar para %s: %s", descrever(item), e)
+                        relatorio.falhas += 1
+                        return
+
+        with metricas.cronometrar('envio_dm'):
+            await asyncio.gather(*(_enviar_um(item) for item in unicos))
+        relatorio.duracao = time.monotonic() - relatorio.inicio
+        metricas.incrementar('dm_enviadas', relatorio.enviados)
+        metricas.incrementar('dm_falhas', relatorio.falhas)
+        metricas.incrementar('dm_rate_limits', relatorio.rate_limits)
+        return relatorio
+
+# --- Resolução de Destinatários ---
+
+def ids_destino(alvo):
+    """IDs de uma entrada do USER_MAP (um ID ou lista de IDs)."""
+    if not alvo:
+        return []
+    return list(alvo) if isinstance(alvo, (list, tuple)) else [alvo]
+
+class ResolvedorDestinatarios:
+    """
+    Resolve IDs do USER_MAP em usuário (DM) ou canal, uma única vez por ID.
+    Usa o cache do gateway (get_user/get_channel) e só cai no fetch_user (REST)
+    quando precisa. O resultado fica em cache por DESTINATARIOS_TTL; IDs que não
+    existem também ficam em cache (DESTINATARIOS_TTL_NEGATIVO) para não repetir
+    a busca a cada mensagem.
+    """
+
+    def __init__(self, bot, ttl=DESTINATARIOS_TTL, ttl_negativo=DESTINATARIOS_TTL_NEGATIVO):
+        self.bot = bot
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self._cache = {}       # id -> (destino ou None, expira_em)
+        self._em_andamento = {}  # id -> Task (evita buscar o mesmo ID em paralelo)
+
+    async def _buscar(self, alvo_id):
+        destino = self.bot.get_user(alvo_id) or self.bot.get_channel(alvo_id)
+        if destino is None:
+            try:
+                destino = await self.bot.fetch_user(alvo_id)
+            except discord.errors.NotFound:
+                destino = None
+            except discord.errors.HTTPException as e:
+                # Erro temporário: não guarda resultado negativo
+                log.warning("Falha temporária ao buscar o ID %s: %s", alvo_id, e)
+                return None
+
+        ttl = self.ttl if destino is not None else self.ttl_negativo
+        self._cache[alvo_id] = (destino, time.monotonic() + ttl)
+        if destino is None:
+            log.warning("ID %s não corresponde a usuário nem canal válido (guardado por %ds).", alvo_id, ttl)
+        return destino
+
+    async def resolver(self, alvo_id):
+        """Destino (usuário ou canal) do ID, ou None se não existe."""
+        em_cache = self._cache.get(alvo_id)
+        if em_cache and em_cache[1] > time.monotonic():
+            return em_cache[0]
+
+        tarefa = self._em_andamento.get(alvo_id)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(self._buscar(alvo_id))
+            self._em_andamento[alvo_id] = tarefa
+            tarefa.add_done_callback(lambda _: self._em_andamento.pop(alvo_id, None))
+        return await tarefa
+
+    async def pre_carregar(self, alvos):
+        """Resolve de uma vez, em paralelo, todos os IDs distintos das entradas informadas."""
+        distintos = {alvo_id for alvo in alvos for alvo_id in ids_destino(alvo)}
+        inicio = time.monotonic()
+        with metricas.cronometrar('resolucao_destinatarios'):
+            resultados = await asyncio.gather(*(self.resolver(i) for i in distintos))
+        encontrados = sum(1 for r in resultados if r is not None)
+        log.info("%d/%d destinatário(s) resolvido(s) em %.2fs.", encontrados, len(distintos), time.monotonic() - inicio)
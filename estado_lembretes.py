@@ -0,0 +1,129 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+from log_config import obter_logger
+import metricas
+
+# --- Estado dos Lembretes (SQLite local) ---
+# Guarda, por (fonte, linha, tarefa), uma impressão digital do que foi cobrado
+# (responsável, curso e prazo planejado) e quando foi o último lembrete. A cada
+# verificação só são enviadas as pendências novas, as que mudaram desde o último
+# envio e as que já passaram do intervalo de repetição.
+# O status entra pela presença na tabela: só tarefas abertas viram pendência, e a
+# que some da planilha (concluída) é esquecida; se reabrir, conta como nova.
+load_dotenv()
+# Arquivo do banco (por padrão, junto do cache da planilha)
+LEMBRETES_ARQUIVO = os.getenv('LEMBRETES_ARQUIVO', os.path.join(os.getenv('CACHE_DIR', '.cache'), 'lembretes.sqlite3'))
+# Horas até repetir o lembrete de uma pendência que não mudou (0 = repete em toda verificação)
+LEMBRETES_REPETIR_HORAS = float(os.getenv('LEMBRETES_REPETIR_HORAS', '24'))
+# Tolerância no intervalo: verificações agendadas no mesmo horário variam alguns segundos
+FOLGA_REPETICAO_SEGUNDOS = 15 * 60
+
+log = obter_logger('lembretes')
+
+def impressao_pendencia(p):
+    """Impressão digital do que a cobrança mostra: responsável, curso e prazo."""
+    texto = "\x1f".join(str(v) for v in (p.pessoa, p.curso, p.dia))
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:16]
+
+def chave_pendencia(p):
+    """Chave da pendência no banco: (fonte, linha no Sheets, tarefa)."""
+    return (p.fonte or '', int(p.row_index), p.tarefa)
+
+class EstadoLembretes:
+    """
+    Banco SQLite com o último lembrete de cada pendência. Seguro entre threads:
+    as chamadas vêm do pool do event loop (run_in_executor), uma por vez.
+    """
+
+    def __init__(self, caminho=LEMBRETES_ARQUIVO, repetir_horas=LEMBRETES_REPETIR_HORAS):
+        self.caminho = caminho
+        self.repetir_segundos = repetir_horas * 3600
+        self._lock = threading.Lock()
+        self._conexao = None
+
+    def _conectar(self):
+        if self._conexao is None:
+            os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS lembretes ("
+                " fonte TEXT NOT NULL, row_index INTEGER NOT NULL, tarefa TEXT NOT NULL,"
+                " impressao TEXT NOT NULL, ultimo_envio REAL NOT NULL,"
+                " PRIMARY KEY (fonte, row_index, tarefa)"
+                ") WITHOUT ROWID"
+            )
+            self._conexao.commit()
+        return self._conexao
+
+    def _repetir(self, ultimo_envio, agora):
+        return not self.repetir_segundos or agora - ultimo_envio >= self.repetir_segundos - FOLGA_REPETICAO_SEGUNDOS
+
+    def selecionar(self, pendencias, agora=None):
+        """
+        Separa as pendências que devem ser cobradas agora.
+        Retorna (a_enviar, contagem) com contagem de 'novas', 'alteradas', 'repetidas' e 'em_dia'.
+        """
+        agora = time.time() if agora is None else agora
+        with self._lock:
+            conhecidas = {
+                (fonte, row_index, tarefa): (impressao, ultimo_envio)
+                for fonte, row_index, tarefa, impressao, ultimo_envio
+                in self._conectar().execute("SELECT fonte, row_index, tarefa, impressao, ultimo_envio FROM lembretes")
+            }
+
+        a_enviar = []
+        contagem = {'novas': 0, 'alteradas': 0, 'repetidas': 0, 'em_dia': 0}
+        for p in pendencias:
+            anterior = conhecidas.get(chave_pendencia(p))
+            if anterior is None:
+                motivo = 'novas'
+            elif anterior[0] != impressao_pendencia(p):
+                motivo = 'alteradas'
+            elif self._repetir(anterior[1], agora):
+                motivo = 'repetidas'
+            else:
+                contagem['em_dia'] += 1
+                continue
+            contagem[motivo] += 1
+            a_enviar.append(p)
+
+        for motivo, n in contagem.items():
+            metricas.incrementar('lembretes', n, motivo=motivo)
+        return a_enviar, contagem
+
+    def registrar_envios(self, pendencias, agora=None):
+        """Grava (ou atualiza) a impressão e o horário do lembrete das pendências entregues."""
+        agora = time.time() if agora is None else agora
+        with self._lock:
+            conexao = self._conectar()
+            conexao.executemany(
+                "INSERT INTO lembretes (fonte, row_index, tarefa, impressao, ultimo_envio) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (fonte, row_index, tarefa) DO UPDATE SET impressao = excluded.impressao, ultimo_envio = excluded.ultimo_envio",
+                [(*chave_pendencia(p), impressao_pendencia(p), agora) for p in pendencias]
+            )
+            conexao.commit()
+
+    def esquecer_resolvidas(self, pendencias, fontes=None):
+        """
+        Apaga as entradas que não estão mais entre as pendências atuais.
+        Só mexe nas `fontes` lidas com sucesso (uma fonte que falhou na leitura não
+        perde o seu estado); uma fonte lida sem nenhuma pendência é toda esquecida.
+        Sem `fontes`, vale cada fonte presente em `pendencias`. Retorna quantas foram apagadas.
+        """
+        ativas = {chave_pendencia(p) for p in pendencias}
+        fontes = {chave[0] for chave in ativas} if fontes is None else {f or '' for f in fontes}
+        with self._lock:
+            conexao = self._conectar()
+            resolvidas = [
+                chave for chave in conexao.execute("SELECT fonte, row_index, tarefa FROM lembretes")
+                if chave[0] in fontes and chave not in ativas
+            ]
+            conexao.executemany("DELETE FROM lembretes WHERE fonte = ? AND row_index = ? AND tarefa = ?", resolvidas)
+            conexao.commit()
+        if resolvidas:
+            log.info("%d pendência(s) resolvida(s) removida(s) do estado de lembretes.", len(resolvidas))
+        return len(resolvidas)
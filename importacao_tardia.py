@@ -0,0 +1,58 @@
+import importlib
+import threading
+import time
+from log_config import obter_logger
+
+# --- Importação Tardia ---
+# pandas, numpy, gspread, google-auth e pyarrow somam centenas de ms e dezenas de MB
+# na partida do bot, mas só são usados quando o Sheets é acessado. Os módulos que
+# dependem deles guardam um ModuloTardio no lugar do módulo: o import de verdade
+# acontece no primeiro acesso a um atributo (ex: pd.DataFrame) ou em aquecer().
+
+log = obter_logger('importacao')
+
+class ModuloTardio:
+    """Proxy de módulo: importa `nome` no primeiro acesso a um atributo (seguro entre threads)."""
+
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+        self._lock = threading.Lock()
+
+    def _carregar(self):
+        if self._modulo is None:
+            with self._lock:
+                if self._modulo is None:
+                    inicio = time.perf_counter()
+                    modulo = importlib.import_module(self._nome)
+                    log.debug("Módulo '%s' importado em %.0fms.", self._nome, (time.perf_counter() - inicio) * 1000)
+                    self._modulo = modulo
+        return self._modulo
+
+    @property
+    def carregado(self):
+        return self._modulo is not None
+
+    def __getattr__(self, atributo):
+        return getattr(self._carregar(), atributo)
+
+    def __repr__(self):
+        return f"<ModuloTardio '{self._nome}' ({'carregado' if self.carregado else 'pendente'})>"
+
+_registrados = []
+
+def tardio(nome):
+    """ModuloTardio de `nome`, registrado para o aquecer()."""
+    modulo = ModuloTardio(nome)
+    _registrados.append(modulo)
+    return modulo
+
+def aquecer():
+    """Importa agora todos os módulos tardios ainda pendentes (ex: numa thread após o on_ready)."""
+    pendentes = [m for m in _registrados if not m.carregado]
+    if not pendentes:
+        return
+    inicio = time.perf_counter()
+    for modulo in pendentes:
+        modulo._carregar()
+    log.info("%d biblioteca(s) pesada(s) carregada(s) em segundo plano em %.2fs.", len(pendentes), time.perf_counter() - inicio)
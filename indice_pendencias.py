@@ -0,0 +1,98 @@
+import bisect
+import time
+from log_config import obter_logger
+
+# --- Índice das Pendências em Memória ---
+# O resultado de cada leitura da planilha fica indexado por pessoa, curso, tarefa
+# e data esperada, para os comandos de consulta responderem sem ir ao Sheets.
+# Cada leitura monta um índice novo e o troca pelo anterior numa única atribuição:
+# quem está consultando continua com o índice antigo, inteiro, até terminar.
+
+log = obter_logger('indice')
+
+def _chave(texto):
+    """Forma normalizada para busca (sem diferença de maiúsculas e espaços nas pontas)."""
+    return str(texto).strip().casefold()
+
+class IndicePendencias:
+    """
+    Índice imutável de uma leitura. As pendências ficam em ordem de prioridade
+    (mais dias de atraso primeiro; as demais na ordem da planilha) e cada índice
+    guarda posições nessa lista, então toda busca já sai priorizada.
+    """
+
+    def __init__(self, pendencias):
+        self.gerado_em = time.time()
+        ordem = sorted(range(len(pendencias)), key=lambda i: -pendencias[i].dias_atraso)
+        self.pendencias = tuple(pendencias[i] for i in ordem)
+
+        self.por_pessoa, self.por_curso, self.por_tarefa = {}, {}, {}
+        self.nomes = {}  # chave normalizada -> nome como está na planilha
+        datas = []
+        for posicao, p in enumerate(self.pendencias):
+            for indice, valor in ((self.por_pessoa, p.pessoa), (self.por_curso, p.curso), (self.por_tarefa, p.tarefa)):
+                chave = _chave(valor)
+                indice.setdefault(chave, []).append(posicao)
+                self.nomes.setdefault(chave, valor)
+            data = p.esperado or p.prazo
+            if data is not None:
+                datas.append((data.toordinal(), posicao))
+        datas.sort()
+        self._datas = [d for d, _ in datas]
+        self._posicoes_por_data = [posicao for _, posicao in datas]
+
+    def __len__(self):
+        return len(self.pendencias)
+
+    @property
+    def idade(self):
+        """Segundos desde a leitura que gerou o índice."""
+        return time.time() - self.gerado_em
+
+    def _posicoes(self, indice, valor, exato=False):
+        """
+        Posições do valor exato; sem ele, de todos os valores que o contêm (ex: parte do nome).
+        Com `exato`, só o valor exato (nada se ele não está no índice).
+        """
+        chave = _chave(valor)
+        if chave in indice or exato:
+            return set(indice.get(chave, ()))
+        return {posicao for k, posicoes in indice.items() if chave in k for posicao in posicoes}
+
+    def buscar(self, pessoa=None, curso=None, tarefa=None, ate=None, exato=False):
+        """
+        Pendências que atendem a todos os filtros informados (`ate`: data esperada até esse dia), priorizadas.
+        Com `exato`, pessoa/curso/tarefa precisam bater inteiros (sem busca por parte do nome).
+        """
+        filtros = []
+        for indice, valor in ((self.por_pessoa, pessoa), (self.por_curso, curso), (self.por_tarefa, tarefa)):
+            if valor:
+                filtros.append(self._posicoes(indice, valor, exato))
+        if ate is not None:
+            fim = bisect.bisect_right(self._datas, ate.toordinal())
+            filtros.append(set(self._posicoes_por_data[:fim]))
+
+        if not filtros:
+            return list(self.pendencias)
+        posicoes = set.intersection(*filtros)
+        return [self.pendencias[i] for i in sorted(posicoes)]
+
+    def sugestoes(self, indice, texto, limite=25):
+        """Nomes do índice que contêm `texto` (para o autocompletar dos comandos)."""
+        chave = _chave(texto)
+        return [self.nomes[k] for k in sorted(indice) if chave in k][:limite]
+
+_atual = None
+
+def publicar(pendencias):
+    """Monta o índice da leitura e o coloca no lugar do anterior. Retorna o índice novo."""
+    global _atual
+    inicio = time.perf_counter()
+    novo = IndicePendencias(pendencias)
+    _atual = novo
+    log.info("Índice de %d pendência(s) atualizado em %.0fms.", len(novo), (time.perf_counter() - inicio) * 1000)
+    return novo
+
+def atual():
+    """Índice da última leitura (None antes da primeira)."""
+    return _atual
@@ -0,0 +1,67 @@
+import logging
+import os
+import random
+from dotenv import load_dotenv
+
+# --- Configuração de Logs ---
+# Todos os módulos usam loggers "botedu.<módulo>" com formatação preguiçosa
+# (log.info("... %s", valor)): a mensagem só é montada se o nível estiver ativo.
+#
+#   LOG_LEVEL          nível geral (DEBUG, INFO, WARNING...). Padrão: INFO
+#   LOG_MODO           'detalhado' (padrão) ou 'resumo': em produção, só passam
+#                      os resumos de cada execução, avisos e erros
+#   LOG_TRACE_CURSOS   cursos (separados por ';') com trace por tarefa na análise
+#   LOG_TRACE_AMOSTRA  fração (0 a 1) de cursos sorteados para o mesmo trace
+load_dotenv()
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_MODO = os.getenv('LOG_MODO', 'detalhado').lower()
+LOG_TRACE_CURSOS = {c.strip() for c in os.getenv('LOG_TRACE_CURSOS', '').split(';') if c.strip()}
+LOG_TRACE_AMOSTRA = float(os.getenv('LOG_TRACE_AMOSTRA', '0'))
+
+# Marca uma mensagem como resumo da execução (passa mesmo no modo 'resumo'):
+#   log.info("Total: %d", n, extra=RESUMO)
+RESUMO = {'resumo': True}
+
+FORMATO = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+class _FiltroResumo(logging.Filter):
+    """Deixa passar só resumos, avisos, erros e o trace por curso (se ligado)."""
+    def filter(self, record):
+        return (
+            record.levelno >= logging.WARNING
+            or getattr(record, 'resumo', False)
+            or record.name == _log_trace.name
+        )
+
+def obter_logger(nome):
+    """Logger nomeado do bot (ex: obter_logger('processador') -> 'botedu.processador')."""
+    return logging.getLogger(f"botedu.{nome}")
+
+_log_trace = obter_logger('trace')
+
+def trace_ativo():
+    """Se há trace por curso configurado (e o logger de trace está em DEBUG)."""
+    return bool(LOG_TRACE_CURSOS or LOG_TRACE_AMOSTRA > 0) and _log_trace.isEnabledFor(logging.DEBUG)
+
+def curso_no_trace(curso):
+    """Se o curso entra no trace: está em LOG_TRACE_CURSOS ou foi sorteado pela amostra."""
+    return curso in LOG_TRACE_CURSOS or (LOG_TRACE_AMOSTRA > 0 and random.random() < LOG_TRACE_AMOSTRA)
+
+def configurar_logging(nivel=None, modo=None):
+    """Configura o handler raiz do bot. Chamar uma vez, no ponto de entrada."""
+    nivel = nivel or LOG_LEVEL
+    modo = modo or LOG_MODO
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(FORMATO))
+    if modo == 'resumo':
+        handler.addFilter(_FiltroResumo())
+
+    raiz = logging.getLogger('botedu')
+    raiz.handlers[:] = [handler]
+    raiz.setLevel(nivel)
+    raiz.propagate = False
+
+    # O trace por curso precisa de DEBUG no logger dele, mesmo com o resto em INFO
+    if LOG_TRACE_CURSOS or LOG_TRACE_AMOSTRA > 0:
+        _log_trace.setLevel(logging.DEBUG)
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from log_config import obter_logger
+
+# --- Métricas por Etapa ---
+# Cronômetros (histogramas das últimas N medições) e contadores de cada etapa:
+# conexão com o Sheets, get_all_values, mapeamento do cabeçalho, análise,
+# resolução de destinatários, envio de DMs e escritas de status.
+# Exportados em formato texto do Prometheus (arquivo e/ou endpoint HTTP local)
+# e resumidos pelo comando /metricas.
+load_dotenv()
+# Quantas medições recentes cada etapa guarda para os percentis
+METRICAS_JANELA = int(os.getenv('METRICAS_JANELA', '500'))
+# Porta do endpoint HTTP /metrics (0 desliga)
+METRICAS_PORTA = int(os.getenv('METRICAS_PORTA', '0'))
+# Arquivo .prom regravado ao fim de cada verificação (vazio desliga)
+METRICAS_ARQUIVO = os.getenv('METRICAS_ARQUIVO', '')
+
+QUANTIS = (0.5, 0.9, 0.99)
+PREFIXO = "botedu"
+
+log = obter_logger('metricas')
+
+class Histograma:
+    """Últimas `janela` medições de uma etapa, mais soma e contagem totais desde o início."""
+
+    def __init__(self, janela=METRICAS_JANELA):
+        self.amostras = deque(maxlen=janela)
+        self.soma = 0.0
+        self.contagem = 0
+
+    def observar(self, valor):
+        self.amostras.append(valor)
+        self.soma += valor
+        self.contagem += 1
+
+    def quantil(self, q):
+        if not self.amostras:
+            return 0.0
+        ordenadas = sorted(self.amostras)
+        return ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))]
+
+_lock = threading.Lock()
+_histogramas = {}  # etapa -> Histograma
+_contadores = {}   # (nome, (rótulos ordenados)) -> valor
+
+def observar(etapa, segundos):
+    """Registra uma duração (segundos) da etapa."""
+    with _lock:
+        if etapa not in _histogramas:
+            _histogramas[etapa] = Histograma()
+        _histogramas[etapa].observar(segundos)
+
+def incrementar(nome, valor=1, **rotulos):
+    """Soma `valor` ao contador `nome` (com rótulos opcionais, ex: etapa='analise')."""
+    chave = (nome, tuple(sorted(rotulos.items())))
+    with _lock:
+        _contadores[chave] = _contadores.get(chave, 0) + valor
+
+@contextmanager
+def cronometrar(etapa):
+    """Mede o bloco como uma execução da etapa; exceções também contam em etapa_erros."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        incrementar('etapa_erros', etapa=etapa)
+        raise
+    finally:
+        observar(etapa, time.perf_counter() - inicio)
+
+def _rotulos(pares):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pares) + "}" if pares else ""
+
+def exportar_prometheus():
+    """Texto no formato de exposição do Prometheus."""
+    with _lock:
+        histogramas = {etapa: (list(h.amostras), h.soma, h.contagem) for etapa, h in _histogramas.items()}
+        contadores = dict(_contadores)
+
+    linhas = [
+        f"# HELP {PREFIXO}_etapa_duracao_segundos Duração de cada etapa (últimas {METRICAS_JANELA} medições nos quantis).",
+        f"# TYPE {PREFIXO}_etapa_duracao_segundos summary",
+    ]
+    for etapa, (amostras, soma, contagem) in sorted(histogramas.items()):
+        ordenadas = sorted(amostras)
+        for q in QUANTIS:
+            valor = ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))] if ordenadas else 0.0
+            linhas.append(f'{PREFIXO}_etapa_duracao_segundos{{etapa="{etapa}",quantile="{q}"}} {valor:.6f}')
+        linhas.append(f'{PREFIXO}_etapa_duracao_segundos_sum{{etapa="{etapa}"}} {soma:.6f}')
+        linhas.append(f'{PREFIXO}_etapa_duracao_segundos_count{{etapa="{etapa}"}} {contagem}')
+
+    for nome in sorted({nome for nome, _ in contadores}):
+        linhas.append(f"# TYPE {PREFIXO}_{nome}_total counter")
+        for (n, rotulos), valor in sorted(contadores.items()):
+            if n == nome:
+                linhas.append(f"{PREFIXO}_{nome}_total{_rotulos(rotulos)} {valor}")
+
+    return "\n".join(linhas) + "\n"
+
+def resumo_texto():
+    """Resumo legível (para o /metricas): p50/p90/máx e contagem por etapa, mais os contadores."""
+    with _lock:
+        etapas = [
+            (etapa, h.contagem, h.quantil(0.5), h.quantil(0.9), max(h.amostras, default=0.0))
+            for etapa, h in sorted(_histogramas.items())
+        ]
+        contadores = sorted(_contadores.items())
+
+    if not etapas and not contadores:
+        return "Nenhuma métrica registrada ainda."
+
+    linhas = ["**Etapa** — execuções | p50 | p90 | máx (janela recente)"]
+    for etapa, contagem, p50, p90, maximo in etapas:
+        linhas.append(f"- `{etapa}` — {contagem} | {p50 * 1000:.0f}ms | {p90 * 1000:.0f}ms | {maximo * 1000:.0f}ms")
+    if contadores:
+        linhas.append("**Contadores**")
+        for (nome, rotulos), valor in contadores:
+            linhas.append(f"- `{nome}{_rotulos(rotulos)}`: {valor}")
+    return "\n".join(linhas)
+
+def salvar_arquivo(caminho=None):
+    """Regrava o arquivo .prom (para o textfile collector do node_exporter)."""
+    caminho = caminho or METRICAS_ARQUIVO
+    if not caminho:
+        return
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(exportar_prometheus())
+    os.replace(temporario, caminho)
+
+class _HandlerMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        corpo = exportar_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        log.debug("HTTP /metrics: " + formato, *args)
+
+_servidor = None
+
+def iniciar_servidor_http(porta=None):
+    """Sobe o endpoint http://127.0.0.1:<porta>/metrics numa thread (uma vez só)."""
+    global _servidor
+    porta = METRICAS_PORTA if porta is None else porta
+    if not porta or _servidor is not None:
+        return _servidor
+    _servidor = ThreadingHTTPServer(('127.0.0.1', porta), _HandlerMetricas)
+    threading.Thread(target=_servidor.serve_forever, name='metricas-http', daemon=True).start()
+    log.info("Endpoint de métricas em http://127.0.0.1:%d/metrics", porta)
+    return _servidor
@@ -1,19 +1,53 @@
-import pandas as pd
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
 import time 
 import os
 import re
+import asyncio
+import functools
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dotenv import load_dotenv
-import gspread 
-from google.oauth2.service_account import Credentials
-from gspread.exceptions import WorksheetNotFound
-from google.oauth2.service_account import Credentials
+import logging
+import cache_planilha
+import cota_sheets
+import metricas
+from importacao_tardia import tardio
+from log_config import RESUMO, configurar_logging, obter_logger, trace_ativo, curso_no_trace
+
+# Bibliotecas pesadas: carregadas no primeiro uso (ver importacao_tardia)
+np = tardio('numpy')
+pd = tardio('pandas')
+gspread = tardio('gspread')
+gspread_utils = tardio('gspread.utils')
+requests = tardio('requests')
+google_auth_requests = tardio('google.auth.transport.requests')
+service_account = tardio('google.oauth2.service_account')
 
 # --- Configuração Sheets/Bot ---
 load_dotenv()
 SHEET_ID = os.getenv('SHEET_ID')
 SHEET_NAME = os.getenv('SHEET_NAME')
 ARQUIVO_CREDENCIAL = os.getenv('ARQUIVO_CREDENCIAL')
+# Máximo de chamadas ao Sheets rodando ao mesmo tempo fora do event loop do bot
+SHEETS_MAX_WORKERS = int(os.getenv('SHEETS_MAX_WORKERS', '4'))
+# Cache local em disco do DataFrame para a partida e as consultas (a verificação que envia DMs
+# sempre lê da rede): idade máxima (segundos) para servir sem ir à rede (0 desliga)
+CACHE_DIR = os.getenv('CACHE_DIR', '.cache')
+CACHE_IDADE_MAXIMA = int(os.getenv('CACHE_IDADE_MAXIMA', '300'))
+# Sincronização incremental: baixa só as colunas usadas e reanalisa só linhas alteradas
+SYNC_INCREMENTAL = os.getenv('SYNC_INCREMENTAL', '0') == '1'
+# Várias fontes (planilha:aba) separadas por ';', ex: "1AbC:2025.1;1AbC:Parceiro X;9XyZ:Cronograma"
+# Sem FONTES, usa só SHEET_ID/SHEET_NAME
+FONTES_TEXTO = os.getenv('FONTES', '')
+# Leitura em blocos: linhas por requisição, analisadas conforme chegam (0 = get_all_values de uma vez)
+LINHAS_POR_BLOCO = int(os.getenv('LINHAS_POR_BLOCO', '0'))
+# Processos para analisar as fontes em paralelo (0 = automático: um por fonte, até o nº de CPUs)
+ANALISE_PROCESSOS = int(os.getenv('ANALISE_PROCESSOS', '0'))
+
+log = obter_logger('processador')
+log_trace = obter_logger('trace')
 
 # Lista das colunas de tarefas principais
 TAREFAS_PRINCIPAIS = [
@@ -30,54 +64,185 @@ TAREFAS_PRINCIPAIS = [
 
 # --- Lógica de Conexão e Leitura ---
 
-def conectar_sheets():
-    """Conecta ao Google Sheets usando o Service Account e retorna o WorkSheet."""
-    print("[LOG] Tentando conectar ao Google Sheets...")
-    scope = [
-        'https://www.googleapis.com/auth/spreadsheets',
-        'https://www.googleapis.com/auth/drive'
-    ]
-    
-    try:
-        creds = Credentials.from_service_account_file(ARQUIVO_CREDENCIAL, scopes=scope)
-        client = gspread.authorize(creds)
-        spreadsheet = client.open_by_key(SHEET_ID)
-        print(f"[LOG] Planilha '{spreadsheet.title}' aberta com sucesso.")
-        worksheet = spreadsheet.worksheet(SHEET_NAME)
-        
-        print(f"[LOG] Conexão bem-sucedida! Aba: '{worksheet.title}'")
-        return worksheet
-    except gspread.exceptions.WorksheetNotFound:
-        print(f"--- ERRO FATAL ---")
-        print(f"Aba '{SHEET_NAME}' não encontrada na planilha.")
-        print(f"Verifique se o nome da aba está escrito EXATAMENTE igual (maiúsculas/minúsculas).")
-        raise
-    except Exception as e:
-        print(f"--- ERRO FATAL ---")
-        print(f"Erro de conexão/autenticação com Google Sheets: {e}")
-        print("Verifique se o 'credentials.json' está na pasta e se o 'client_email' tem permissão de EDITOR na planilha.")
-        raise
+SCOPES_SHEETS = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+# Renova o token OAuth quando faltar menos do que isso (segundos) para expirar
+MARGEM_RENOVACAO_TOKEN = int(os.getenv('MARGEM_RENOVACAO_TOKEN', '300'))
+# Códigos HTTP que indicam handle/sessão inválidos (vale reconectar e tentar de novo)
+STATUS_RECONECTAR = (401, 404)
 
-def carregar_dataframe(worksheet):
+class ConexaoSheets:
     """
-    Lê os dados da aba e constrói o DataFrame com os cabeçalhos corretos.
-    (CORREÇÃO 2: Esta função agora corrige o cabeçalho)
+    Cliente de longa duração para uma aba do Google Sheets.
+    Autentica uma única vez e reaproveita a sessão HTTP do gspread (keep-alive)
+    e o handle da aba entre leitor e escritor. O token é renovado antes de
+    expirar e o handle é refeito automaticamente quando deixa de ser válido.
     """
-    print("[LOG] Carregando todos os dados da aba (get_all_values)...")
-    data = worksheet.get_all_values()
-    
-    if not data or len(data) < 2:
-        raise ValueError("Dados insuficientes ou Planilha vazia.")
-    
-    print(f"[LOG] {len(data)} linhas (brutas) e {len(data[0])} colunas (brutas) lidas.")
 
-    headers_row_1 = data[0] # Cabeçalho Nível 1 (Tarefas)
-    headers_row_2 = data[1] # Cabeçalho Nível 2 (Resp, Planejado, Realizado)
-    
+    def __init__(self, sheet_id, sheet_name, arquivo_credencial):
+        self.sheet_id = sheet_id
+        self.sheet_name = sheet_name
+        self.arquivo_credencial = arquivo_credencial
+        self._lock = threading.RLock()
+        self._creds = None
+        self._client = None
+        self._worksheet = None
+        self._fila_escrita = None
+        self._sincronizador = None
+        self._atualizacao_cache = None
+        # Impressão digital do cabeçalho já conferida contra a aba (o snapshot com ela não precisa de nova conferência)
+        self.impressao_conferida = None
+        # Vira True quando gravamos na aba: o snapshot em disco deixa de refletir a planilha
+        self.cache_sujo = False
+        self.fonte = id_fonte(sheet_id, sheet_name)
+        chave = hashlib.sha1(f"{sheet_id}:{sheet_name}".encode('utf-8')).hexdigest()[:12]
+        self.caminho_cache = os.path.join(CACHE_DIR, f"planilha_{chave}.parquet")
+
+    @property
+    def sincronizador(self):
+        """Snapshot incremental (SincronizadorPlanilha) desta aba, criado no primeiro uso."""
+        with self._lock:
+            if self._sincronizador is None:
+                self._sincronizador = SincronizadorPlanilha()
+            return self._sincronizador
+
+    @property
+    def fila_escrita(self):
+        """Fila de escrita (FilaEscrita) desta aba, criada no primeiro uso."""
+        with self._lock:
+            if self._fila_escrita is None:
+                self._fila_escrita = FilaEscrita(self)
+            return self._fila_escrita
+
+    def _renovar_token_se_preciso(self):
+        """Faz o refresh do token se ele não existe ou está perto de expirar."""
+        creds = self._creds
+        agora = datetime.now(timezone.utc).replace(tzinfo=None)  # google-auth usa UTC "naive"
+        if creds.valid and creds.expiry and creds.expiry - agora > timedelta(seconds=MARGEM_RENOVACAO_TOKEN):
+            return
+        log.info("Renovando token de acesso do Google Sheets...")
+        creds.refresh(google_auth_requests.Request())
+
+    @metricas.cronometrar('conexao_sheets')
+    def _conectar(self):
+        log.info("Tentando conectar ao Google Sheets...")
+        try:
+            if self._client is None:
+                self._creds = service_account.Credentials.from_service_account_file(self.arquivo_credencial, scopes=SCOPES_SHEETS)
+                self._client = gspread.authorize(self._creds)
+            self._renovar_token_se_preciso()
+            spreadsheet = cota_sheets.ler(self._client.open_by_key, self.sheet_id)
+            log.info("Planilha '%s' aberta com sucesso.", spreadsheet.title)
+            self._worksheet = cota_sheets.ler(spreadsheet.worksheet, self.sheet_name)
+
+            log.info("Conexão bem-sucedida! Aba: '%s'", self._worksheet.title)
+        except gspread.exceptions.WorksheetNotFound:
+            log.error(
+                "Aba '%s' não encontrada na planilha. Verifique se o nome da aba está escrito "
+                "EXATAMENTE igual (maiúsculas/minúsculas).", self.sheet_name
+            )
+            raise
+        except Exception as e:
+            self._client = None
+            log.error(
+                "Erro de conexão/autenticação com Google Sheets: %s. Verifique se o 'credentials.json' "
+                "está na pasta e se o 'client_email' tem permissão de EDITOR na planilha.", e
+            )
+            raise
+
+    def worksheet(self):
+        """Retorna o handle da aba, conectando na primeira vez e renovando o token quando preciso."""
+        with self._lock:
+            if self._worksheet is None:
+                self._conectar()
+            else:
+                self._renovar_token_se_preciso()
+            return self._worksheet
+
+    def invalidar(self):
+        """Descarta o handle da aba; a próxima chamada reabre a planilha."""
+        with self._lock:
+            self._worksheet = None
+
+    def executar(self, operacao, *args, **kwargs):
+        """
+        Roda `operacao(worksheet, ...)` com o handle compartilhado.
+        Se o handle estiver inválido (401/404, aba renomeada, conexão caída),
+        reconecta e tenta mais uma vez.
+        """
+        try:
+            return operacao(self.worksheet(), *args, **kwargs)
+        except Exception as e:
+            if not _handle_invalido(e):
+                raise
+            log.warning("Handle do Sheets inválido (%s). Reconectando...", e)
+            self.invalidar()
+            return operacao(self.worksheet(), *args, **kwargs)
+
+def _handle_invalido(erro):
+    """Indica se o erro vem de um handle/sessão que vale a pena refazer."""
+    if isinstance(erro, gspread.exceptions.WorksheetNotFound):
+        return True
+    if isinstance(erro, gspread.exceptions.APIError):
+        return erro.response.status_code in STATUS_RECONECTAR
+    return isinstance(erro, requests.exceptions.ConnectionError)
+
+_conexoes = {}
+_conexoes_lock = threading.Lock()
+
+def obter_conexao(sheet_id=None, sheet_name=None):
+    """Retorna a ConexaoSheets compartilhada para (planilha, aba), criando-a na primeira vez."""
+    chave = (sheet_id or SHEET_ID, sheet_name or SHEET_NAME)
+    with _conexoes_lock:
+        if chave not in _conexoes:
+            _conexoes[chave] = ConexaoSheets(chave[0], chave[1], ARQUIVO_CREDENCIAL)
+        return _conexoes[chave]
+
+def conectar_sheets():
+    """Retorna o WorkSheet da conexão compartilhada (autentica só na primeira chamada)."""
+    return obter_conexao().worksheet()
+
+# --- Múltiplas Fontes (planilha, aba) ---
+
+def ler_fontes(texto):
+    """Converte "planilha:aba;planilha:aba" em [(sheet_id, sheet_name)]."""
+    fontes = []
+    for item in texto.split(';'):
+        if not item.strip():
+            continue
+        sheet_id, _, sheet_name = item.partition(':')
+        fontes.append((sheet_id.strip(), sheet_name.strip()))
+    return fontes
+
+def obter_fontes():
+    """Fontes configuradas, na ordem de FONTES (ou a SHEET_ID/SHEET_NAME padrão)."""
+    return ler_fontes(FONTES_TEXTO) or [(SHEET_ID, SHEET_NAME)]
+
+def id_fonte(sheet_id, sheet_name):
+    """Identificador curto e estável da fonte (vai em cada pendência e no custom_id dos botões)."""
+    return hashlib.sha1(f"{sheet_id}:{sheet_name}".encode('utf-8')).hexdigest()[:8]
+
+def conexao_da_fonte(fonte=None):
+    """ConexaoSheets da fonte com esse identificador (None = a primeira fonte configurada)."""
+    fontes = obter_fontes()
+    if fonte is None:
+        return obter_conexao(*fontes[0])
+    for sheet_id, sheet_name in fontes:
+        if id_fonte(sheet_id, sheet_name) == fonte:
+            return obter_conexao(sheet_id, sheet_name)
+    raise Exception(f"Fonte '{fonte}' não está entre as FONTES configuradas")
+
+def mapear_colunas(headers_row_1, headers_row_2):
+    """
+    Converte as duas linhas de cabeçalho nos nomes finais das colunas
+    (ex: 'Design Educacional_Resp', 'Design Educacional_Realizado_Data').
+    """
     novas_colunas = []
     current_header = "" # Armazena o último cabeçalho principal (ex: 'Design Educacional')
     
-    print("\n--- LOG DETALHADO: Mapeamento de Colunas (Lógica Corrigida) ---")
+    detalhar = log.isEnabledFor(logging.DEBUG)
     
     for i in range(len(headers_row_2)):
         h1 = headers_row_1[i].strip() # Ex: 'Design Educacional' ou ''
@@ -105,106 +270,370 @@ def carregar_dataframe(worksheet):
             # É uma coluna principal (ex: 'Componente Curricular')
             final_col_name = h2_clean
             
-        print(f"[DEBUG] Coluna {i}: (H1: '{h1}', H2: '{h2}') -> Header: '{current_header}' -> Convertida para: {final_col_name}")
+        if detalhar:
+            log.debug("Coluna %d: (H1: '%s', H2: '%s') -> Header: '%s' -> Convertida para: %s", i, h1, h2, current_header, final_col_name)
         novas_colunas.append(final_col_name)
 
-    print("--- Fim Mapeamento de Colunas ---\n")
+    return novas_colunas
+
+# --- Índice do Cabeçalho (colunas de escrita por tarefa) ---
+
+# Por quanto tempo (segundos) a escrita confia no layout em cache sem reconferir o cabeçalho
+LAYOUT_TTL_SEGUNDOS = int(os.getenv('LAYOUT_TTL_SEGUNDOS', '300'))
+
+def impressao_digital_cabecalho(headers_row_1, headers_row_2):
+    """Hash barato das duas linhas de cabeçalho (ignora células vazias no final)."""
+    h = hashlib.sha1()
+    for linha in (headers_row_1, headers_row_2):
+        celulas = list(linha)
+        while celulas and not str(celulas[-1]).strip():
+            celulas.pop()
+        h.update('\x1f'.join(str(c) for c in celulas).encode('utf-8'))
+        h.update(b'\x1e')
+    return h.hexdigest()
+
+class LayoutCabecalho:
+    """
+    Layout das duas linhas de cabeçalho de uma aba: nomes finais das colunas e,
+    para cada tarefa, as colunas (1-based) de 'Realizado' (data) e de Status.
+    """
+
+    def __init__(self, headers_row_1, headers_row_2):
+        largura = max(len(headers_row_1), len(headers_row_2))
+        headers_row_1 = list(headers_row_1) + [''] * (largura - len(headers_row_1))
+        headers_row_2 = list(headers_row_2) + [''] * (largura - len(headers_row_2))
+
+        self.headers_row_1 = headers_row_1
+        self.headers_row_2 = headers_row_2
+        self.impressao_digital = impressao_digital_cabecalho(headers_row_1, headers_row_2)
+        with metricas.cronometrar('mapeamento_cabecalho'):
+            self.colunas = mapear_colunas(headers_row_1, headers_row_2)
+        # Colunas após a última com cabeçalho são só espaçamento (a API nem sempre as devolve)
+        self.largura_util = max(
+            (i + 1 for i in range(largura) if headers_row_1[i].strip() or headers_row_2[i].strip()),
+            default=0
+        )
+        self.verificado_em = time.time()
+
+        col_realizado = {}
+        col_status = {}
+        for i, nome in enumerate(self.colunas):
+            if nome.endswith('_Realizado_Data'):
+                col_realizado.setdefault(nome[:-len('_Realizado_Data')], i + 1)
+            elif nome.endswith('_Status'):
+                tarefa = nome[:-len('_Status')]
+                # Status é a primeira coluna sem subtítulo depois de 'Realizado'
+                if tarefa in col_realizado and tarefa not in col_status:
+                    col_status[tarefa] = i + 1
+
+        self.escrita = {
+            tarefa: (col, col_status.get(tarefa, col + 1))
+            for tarefa, col in col_realizado.items()
+        }
+        # A coluna de status não tem subtítulo: se for a última da aba, também é útil
+        self.largura_util = max([self.largura_util] + [status for _, status in self.escrita.values()])
+        if self.largura_util > largura:
+            # Cabeçalho lido por intervalo (get) vem sem essa coluna: ela ganha o seu nome (<tarefa>_Status)
+            extra = [''] * (self.largura_util - largura)
+            self.headers_row_1 += extra
+            self.headers_row_2 += extra
+            self.colunas = mapear_colunas(self.headers_row_1, self.headers_row_2)
+
+    def colunas_escrita(self, tarefa):
+        """Retorna (coluna Realizado, coluna Status) da tarefa, 1-based."""
+        try:
+            return self.escrita[tarefa.strip()]
+        except KeyError:
+            raise Exception(f"Tarefa '{tarefa}' sem subcoluna 'Realizado' no cabeçalho") from None
+
+_layouts = {}
+_layouts_lock = threading.Lock()
+
+def _chave_aba(worksheet):
+    return (worksheet.spreadsheet_id, worksheet.id)
+
+def _registrar_layout(worksheet, layout):
+    with _layouts_lock:
+        _layouts[_chave_aba(worksheet)] = layout
+
+def _layout_registrado(chave_aba):
+    with _layouts_lock:
+        return _layouts.get(chave_aba)
+
+def obter_layout(worksheet):
+    """
+    Retorna o layout em cache da aba. Se ele não existe ou passou de
+    LAYOUT_TTL_SEGUNDOS, lê só as linhas 1:2 e compara a impressão digital;
+    o índice é refeito apenas quando o cabeçalho mudou.
+    """
+    with _layouts_lock:
+        layout = _layouts.get(_chave_aba(worksheet))
+    if layout and time.time() - layout.verificado_em < LAYOUT_TTL_SEGUNDOS:
+        return layout
+
+    log.info("Conferindo impressão digital do cabeçalho (linhas 1:2)...")
+    cabecalho = cota_sheets.ler(worksheet.get, '1:2')
+    headers_row_1 = cabecalho[0] if len(cabecalho) > 0 else []
+    headers_row_2 = cabecalho[1] if len(cabecalho) > 1 else []
+
+    if layout and layout.impressao_digital == impressao_digital_cabecalho(headers_row_1, headers_row_2):
+        layout.verificado_em = time.time()
+        return layout
+
+    log.info("Cabeçalho novo ou alterado. Reconstruindo índice de colunas...")
+    layout = LayoutCabecalho(headers_row_1, headers_row_2)
+    _registrar_layout(worksheet, layout)
+    return layout
+
+# Colunas de texto com no máximo esta fração de valores distintos viram 'category'
+FRACAO_CATEGORICA = 0.5
+
+def compactar_tipos(df):
+    """
+    Troca as colunas de texto repetitivo (responsáveis, datas, etapas...) por 'category'
+    e as de status por booleano (True = 'TRUE'), no lugar de uma string Python por célula.
+    """
+    df = df.copy(deep=False)
+    for i, nome in enumerate(df.columns):
+        serie = df.iloc[:, i]
+        # Só texto (object ou o 'str' do pandas 3); colunas já convertidas ficam como estão
+        if isinstance(serie.dtype, pd.CategoricalDtype) or not pd.api.types.is_string_dtype(serie.dtype):
+            continue
+        if nome.endswith('_Status'):
+            df.isetitem(i, _texto_limpo(serie).str.upper() == 'TRUE')
+        elif serie.nunique(dropna=False) <= FRACAO_CATEGORICA * len(serie):
+            df.isetitem(i, serie.astype('category'))
+    return df
+
+def carregar_dataframe(worksheet, compactar=True):
+    """
+    Lê os dados da aba e constrói o DataFrame com os cabeçalhos corretos.
+    (CORREÇÃO 2: Esta função agora corrige o cabeçalho)
+    De quebra, registra o layout do cabeçalho usado pelas escritas.
+    Com `compactar` (padrão), as colunas saem com os tipos de compactar_tipos().
+    """
+    log.info("Carregando todos os dados da aba (get_all_values)...")
+    with metricas.cronometrar('get_all_values'):
+        data = cota_sheets.ler(worksheet.get_all_values)
+    
+    if not data or len(data) < 2:
+        raise ValueError("Dados insuficientes ou Planilha vazia.")
+    
+    log.info("%d linhas (brutas) e %d colunas (brutas) lidas.", len(data), len(data[0]))
+
+    # Linha 1 = Tarefas; Linha 2 = Resp, Planejado, Realizado
+    layout = LayoutCabecalho(data[0], data[1])
+    _registrar_layout(worksheet, layout)
             
-    df = pd.DataFrame(data[2:], columns=novas_colunas)
+    df = pd.DataFrame(data[2:], columns=layout.colunas)
     
     # Remove colunas que ficaram com o nome vazio (as colunas de espaçamento)
     df = df.drop(columns=[''], errors='ignore')
     
     # CRÍTICO: Cria o índice real da linha no Sheets. 
-    df['indice_linha_sheets'] = df.index + 3 
+    df['indice_linha_sheets'] = (df.index + 3).astype('int32')
+
+    if compactar:
+        df = compactar_tipos(df)
     
-    print(f"[LOG] Colunas do DF prontas. Total: {len(df.columns)} colunas.")
-    print(f"[DEBUG] Colunas finais (lista): {df.columns.tolist()}")
+    log.info("Colunas do DF prontas. Total: %d colunas.", len(df.columns))
+    log.debug("Colunas finais (lista): %s", df.columns)
     return df
 
-# --- Função de Escrita (Corrigida e Simplificada) ---
+# --- Cache Local em Disco ---
+
+def _recarregar_cache(conexao):
+    """Lê a aba pela rede, regrava o snapshot em disco e retorna o DataFrame."""
+    conexao.cache_sujo = False
+    df = conexao.executar(carregar_dataframe)
+    layout = _layout_registrado(_chave_aba(conexao.worksheet()))
+    conexao.impressao_conferida = layout.impressao_digital
+    try:
+        cache_planilha.salvar_snapshot(conexao.caminho_cache, df, layout)
+    except Exception as e:
+        log.error("Não foi possível gravar o snapshot local. Detalhe: %s", e)
+    return df
 
-def atualizar_status_sheets(row_index, tarefa, novo_status):
+def _conferir_ou_recarregar(conexao, impressao_digital):
     """
-    Atualiza uma célula específica na planilha do Google Sheets.
-    (CORREÇÃO 9: Agora preenche a data e o status)
+    Com `impressao_digital` (a do snapshot servido), só confere o cabeçalho da aba
+    (obter_layout): se mudou, descarta o snapshot e relê. Sem ela, relê direto.
     """
-    print(f"\n[LOG Sheets] Tentando ATUALIZAR status para '{novo_status}'...")
-    worksheet = conectar_sheets()
-    
-    try:
-        print(f"[LOG Sheets] Procurando tarefa '{tarefa}' na Linha 1 do cabeçalho...")
-        # 1. Encontra a coluna da Tarefa Principal
-        cell = worksheet.find(tarefa, in_row=1)
-        
-        if not cell:
-            print(f"[ERRO Sheets] A tarefa principal '{tarefa}' não foi encontrada na Linha 1 da planilha.")
-            raise Exception(f"Tarefa '{tarefa}' não encontrada (Linha 1)")
+    if impressao_digital is not None:
+        layout = conexao.executar(obter_layout)
+        if layout.impressao_digital == impressao_digital:
+            conexao.impressao_conferida = impressao_digital
+            return None
+        log.info("Cabeçalho da aba mudou desde o snapshot. Descartando cache...")
+        cache_planilha.descartar_snapshot(conexao.caminho_cache)
+    return _recarregar_cache(conexao)
 
-        col_tarefa = cell.col
-        print(f"[LOG Sheets] Tarefa encontrada na Coluna {col_tarefa}. Procurando 'Realizado' na Linha 2...")
-        
-        # 2. Encontra a subcoluna 'Realizado'
-        all_realizado_cells = worksheet.findall('Realizado', in_row=2)
-        
-        cell_realizado = None
-        for cell_r in all_realizado_cells:
-            if cell_r.col >= col_tarefa:
-                cell_realizado = cell_r
-                break 
-        
-        if not cell_realizado:
-            print(f"[ERRO Sheets] Não foi possível encontrar a subcoluna 'Realizado' (Linha 2) correspondente à tarefa '{tarefa}'.")
-            raise Exception(f"Subcoluna 'Realizado' não encontrada para '{tarefa}'")
+def atualizar_cache_em_segundo_plano(conexao=None, conferir_impressao=None):
+    """
+    Dispara a releitura da aba no pool do Sheets (no máximo uma por vez). Com
+    `conferir_impressao`, só relê se o cabeçalho da aba não bate mais com ela.
+    """
+    conexao = conexao or obter_conexao()
+    with conexao._lock:
+        if conexao._atualizacao_cache is not None and not conexao._atualizacao_cache.done():
+            return conexao._atualizacao_cache
+        if conferir_impressao is None:
+            log.info("Atualizando snapshot local em segundo plano...")
+        else:
+            log.info("Conferindo o cabeçalho do snapshot local em segundo plano...")
+        conexao._atualizacao_cache = _executor_sheets.submit(_conferir_ou_recarregar, conexao, conferir_impressao)
+        return conexao._atualizacao_cache
 
-        # 3. DEFINIÇÃO DAS CÉLULAS ALVO (A MUDANÇA ESTÁ AQUI)
-        
-        # A coluna de DATA é a própria 'Realizado'
-        coluna_data_realizado = cell_realizado.col
-        # A coluna de STATUS é a seguinte
-        coluna_status_final = cell_realizado.col + 1
-        
-        # Pega a data atual no formato "dd/mm"
-        data_hoje = datetime.now().strftime('%d/%m')
-        
-        print(f"[LOG Sheets] Célula 'Realizado' (Data) encontrada na Coluna {coluna_data_realizado}.")
-        print(f"[LOG Sheets] Célula 'Status' encontrada na Coluna {coluna_status_final}.")
-        
-        # 4. ATUALIZA AMBAS AS CÉLULAS
-        
-        print(f"[LOG Sheets] Atualizando Célula [Linha {row_index}, Col {coluna_data_realizado}] para '{data_hoje}'...")
-        worksheet.update_cell(row_index, coluna_data_realizado, data_hoje)
-        
-        print(f"[LOG Sheets] Atualizando Célula [Linha {row_index}, Col {coluna_status_final}] para '{novo_status}'...")
-        worksheet.update_cell(row_index, coluna_status_final, novo_status)
-        
-        print("[LOG Sheets] Atualização dupla concluída.")
+def carregar_dataframe_cache(conexao=None, idade_maxima=None):
+    """
+    DataFrame da aba vindo do snapshot em disco quando ele tem no máximo `idade_maxima`
+    segundos (padrão CACHE_IDADE_MAXIMA); senão lê pela rede e regrava o snapshot.
+    O snapshot é servido na hora, sem conectar: o cabeçalho é conferido contra a aba
+    em segundo plano (se mudou, o snapshot é descartado e relido). Servir um snapshot
+    com mais da metade da idade máxima já agenda a atualização em segundo plano.
+    """
+    conexao = conexao or obter_conexao()
+    idade_maxima = CACHE_IDADE_MAXIMA if idade_maxima is None else idade_maxima
 
-    except Exception as e:
-        print(f"[ERRO Sheets] Falha ao localizar/atualizar a célula. Detalhe: {e}")
-        raise
+    if idade_maxima > 0 and not conexao.cache_sujo:
+        snapshot = cache_planilha.carregar_snapshot(conexao.caminho_cache, idade_maxima)
+        if snapshot:
+            df, meta = snapshot
+            if cache_planilha.idade_snapshot(meta) > idade_maxima / 2:
+                atualizar_cache_em_segundo_plano(conexao)
+            elif meta['impressao_digital'] != conexao.impressao_conferida:
+                atualizar_cache_em_segundo_plano(conexao, conferir_impressao=meta['impressao_digital'])
+            return df
 
-def normalizar_data(data_str):
+    return _recarregar_cache(conexao)
+
+# --- Função de Escrita (Fila com Coalescência) ---
+
+# Janela (segundos) em que cliques próximos são juntados num único batch_update
+JANELA_ESCRITA_SEGUNDOS = float(os.getenv('JANELA_ESCRITA_SEGUNDOS', '0.5'))
+# Tentativas e backoff em 429/5xx ficam no gerenciador de cota (cota_sheets)
+
+class FilaEscrita:
     """
-    Converte datas escritas como '03/nov.' ou '3/dez' para o formato '03/11'.
-    Aceita variações com pontos ou maiúsculas/minúsculas.
+    Junta as atualizações (linha, tarefa, data, status) que chegam dentro de
+    JANELA_ESCRITA_SEGUNDOS e grava todas num único batch_update.
+    Cada chamador recebe um Future que informa se a SUA escrita deu certo.
     """
-    if not isinstance(data_str, str):
-        return data_str
-    
+
+    def __init__(self, conexao, janela=JANELA_ESCRITA_SEGUNDOS):
+        self.conexao = conexao
+        self.janela = janela
+        self._lock = threading.Lock()
+        self._pendentes = []
+        self._timer = None
+
+    def enfileirar(self, row_index, tarefa, data, novo_status):
+        """Agenda a escrita e retorna um concurrent.futures.Future (None em caso de sucesso)."""
+        futuro = Future()
+        with self._lock:
+            self._pendentes.append((row_index, tarefa, data, novo_status, futuro))
+            if self._timer is None:
+                self._timer = threading.Timer(self.janela, self._descarregar)
+                self._timer.daemon = True
+                self._timer.start()
+        return futuro
+
+    def _descarregar(self):
+        with self._lock:
+            lote, self._pendentes = self._pendentes, []
+            self._timer = None
+        if not lote:
+            return
+        try:
+            self.conexao.executar(self._gravar_lote, lote)
+        except Exception as e:
+            log.error("Falha ao gravar lote de %d atualização(ões). Detalhe: %s", len(lote), e)
+            for *_, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+
+    def _gravar_lote(self, worksheet, lote):
+        layout = obter_layout(worksheet)
+
+        celulas = {}  # (linha, coluna) -> valor; cliques repetidos na mesma célula se fundem
+        aceitos = []
+        for row_index, tarefa, data, novo_status, futuro in lote:
+            # conexao.executar repete esta função após reconectar: quem já falhou fica de fora
+            if futuro.done():
+                continue
+            try:
+                # Colunas-alvo vêm do índice do cabeçalho (sem find/findall remotos)
+                coluna_data_realizado, coluna_status_final = layout.colunas_escrita(tarefa)
+            except Exception as e:
+                log.error("Falha ao localizar a célula de '%s' (Linha %s). Detalhe: %s", tarefa, row_index, e)
+                futuro.set_exception(e)
+                continue
+            celulas[(row_index, coluna_data_realizado)] = data
+            celulas[(row_index, coluna_status_final)] = novo_status
+            aceitos.append(futuro)
+
+        if not celulas:
+            return
+
+        dados = [
+            {'range': gspread_utils.rowcol_to_a1(linha, coluna), 'values': [[valor]]}
+            for (linha, coluna), valor in celulas.items()
+        ]
+        log.info("Gravando %d atualização(ões) (%d células) num único batch_update...", len(aceitos), len(dados))
+        with metricas.cronometrar('batch_update'):
+            cota_sheets.escrever(worksheet.batch_update, dados, value_input_option='USER_ENTERED')
+        log.info("Lote gravado com sucesso.", extra=RESUMO)
+
+        self.conexao.cache_sujo = True
+        for futuro in aceitos:
+            futuro.set_result(None)
+
+def enfileirar_atualizacao(row_index, tarefa, novo_status, fonte=None):
+    """
+    Coloca data de hoje + novo status da tarefa na fila de escrita da fonte
+    (planilha/aba de onde veio a pendência) e retorna o Future.
+    """
+    log.info("Enfileirando atualização de '%s' (Linha %s, fonte %s) para '%s'...", tarefa, row_index, fonte, novo_status)
+    # Pega a data atual (do clique) no formato "dd/mm"
+    data_hoje = datetime.now().strftime('%d/%m')
+    futuro = conexao_da_fonte(fonte).fila_escrita.enfileirar(row_index, tarefa, data_hoje, novo_status)
+
+    # Tempo do clique até o lote gravado (inclui a janela de coalescência)
+    inicio = time.perf_counter()
+    def _medir(f):
+        metricas.observar('atualizar_status', time.perf_counter() - inicio)
+        metricas.incrementar('escritas_status', resultado='erro' if f.exception() else 'ok')
+    futuro.add_done_callback(_medir)
+    return futuro
+
+def atualizar_status_sheets(row_index, tarefa, novo_status, fonte=None):
+    """
+    Preenche a data de 'Realizado' e o status da tarefa na planilha.
+    Bloqueia até o lote que contém esta escrita ser gravado (e levanta o erro dela, se houver).
+    """
+    enfileirar_atualizacao(row_index, tarefa, novo_status, fonte).result()
+
+# --- Datas ---
+# A planilha repete as mesmas poucas datas milhares de vezes: as conversões ficam em
+# cache e, para colunas inteiras, só os valores distintos são convertidos.
+
+# Mapeamento de meses
+MESES = {
+    'jan': '01', 'fev': '02', 'mar': '03', 'abr': '04',
+    'mai': '05', 'jun': '06', 'jul': '07', 'ago': '08',
+    'set': '09', 'out': '10', 'nov': '11', 'dez': '12'
+}
+# Expressões que podem aparecer (ex: 03/nov, 3/dez, 09/09)
+_PADRAO_DATA = re.compile(r'(\d{1,2})/([a-z]+|\d{1,2})')
+_PADRAO_DIA_MES = re.compile(r'(\d{2})/(\d{2})')
+
+@functools.lru_cache(maxsize=4096)
+def _normalizar_texto(data_str):
     data_str = data_str.strip().lower().replace('.', '')
     if not data_str:
         return data_str
     
-    # Mapeamento de meses
-    meses = {
-        'jan': '01', 'fev': '02', 'mar': '03', 'abr': '04',
-        'mai': '05', 'jun': '06', 'jul': '07', 'ago': '08',
-        'set': '09', 'out': '10', 'nov': '11', 'dez': '12'
-    }
-    
-    # Expressões que podem aparecer (ex: 03/nov, 3/dez, 09/09)
-    match = re.match(r'(\d{1,2})/([a-z]+|\d{1,2})', data_str)
+    match = _PADRAO_DATA.match(data_str)
     if not match:
         return data_str  # mantém como está se não casar
     
@@ -217,194 +646,678 @@ def normalizar_data(data_str):
     if mes.isdigit():
         mes = mes.zfill(2)
     else:
-        mes = meses.get(mes[:3], mes)  # tenta mapear abreviação
+        mes = MESES.get(mes[:3], mes)  # tenta mapear abreviação
     
     if mes.isdigit():
         return f"{dia}/{mes}"
     return data_str  # caso não consiga mapear o mês
 
+def normalizar_data(data_str):
+    """
+    Converte datas escritas como '03/nov.' ou '3/dez' para o formato '03/11'.
+    Aceita variações com pontos ou maiúsculas/minúsculas.
+    """
+    if not isinstance(data_str, str):
+        return data_str
+    return _normalizar_texto(data_str)
+
+@functools.lru_cache(maxsize=4096)
+def _interpretar(data_str, referencia):
+    match = _PADRAO_DIA_MES.fullmatch(_normalizar_texto(data_str))
+    if not match:
+        return None
+    dia, mes = int(match.group(1)), int(match.group(2))
+
+    # A planilha não traz o ano: vale o ano que deixa a data mais perto da referência
+    candidatas = []
+    for ano in (referencia.year - 1, referencia.year, referencia.year + 1):
+        try:
+            candidatas.append(date(ano, mes, dia))
+        except ValueError:
+            pass  # dia/mês inexistente (ex: 31/02, 29/02 fora de ano bissexto)
+    return min(candidatas, key=lambda d: abs(d - referencia), default=None)
+
+def interpretar_data(data_str, referencia=None):
+    """
+    Data (datetime.date) de um texto como '03/nov.', com o ano mais próximo de
+    `referencia` (padrão: hoje). None se o texto não for uma data válida.
+    """
+    if not isinstance(data_str, str):
+        return None
+    return _interpretar(data_str, referencia or date.today())
+
+def normalizar_coluna(valores, referencia=None):
+    """
+    Normaliza uma coluna inteira de datas convertendo só os valores distintos.
+    Retorna (textos 'dd/mm' como em normalizar_data, datas em datetime64[D] com NaT
+    onde não há data válida), ambos arrays do mesmo tamanho de `valores`.
+    """
+    referencia = referencia or date.today()
+    codigos, unicos = pd.factorize(np.asarray(valores, dtype=object), use_na_sentinel=False)
+    textos = np.empty(len(unicos), dtype=object)
+    textos[:] = [normalizar_data(v) for v in unicos]
+    datas = np.array([interpretar_data(v, referencia) for v in unicos], dtype='datetime64[D]')
+    return textos[codigos], datas[codigos]
+
+def pendencias_atrasadas(pendencias, referencia=None):
+    """
+    Pendências com data esperada (ver calcular_prazos) anterior a `referencia` (padrão: hoje),
+    da mais atrasada para a mais recente.
+    """
+    referencia = np.datetime64(referencia or date.today(), 'D')
+    esperados = np.array([p.esperado for p in pendencias], dtype='datetime64[D]')
+    atrasadas = np.flatnonzero(esperados < referencia)  # NaT nunca é menor: sem data não conta
+    atrasadas = atrasadas[np.argsort(esperados[atrasadas], kind='stable')]
+    return [pendencias[i] for i in atrasadas]
+
+def priorizar_pendencias(pendencias, referencia=None):
+    """Todas as pendências, as atrasadas primeiro (mais dias de atraso antes); as demais na ordem original."""
+    atrasadas = pendencias_atrasadas(pendencias, referencia)
+    vistas = {id(p) for p in atrasadas}
+    return atrasadas + [p for p in pendencias if id(p) not in vistas]
+
+# --- Motor de Prazos (dependências entre etapas) ---
+# Os cabeçalhos das etapas trazem a cadeia do cronograma: "R1 - (3DIAS após DE)",
+# "Design Gráfico - (2DIAS após R1)"... Cada etapa com "(NDIA(S) após X)" depende
+# da etapa X e deve terminar N dias depois dela.
+
+_PADRAO_DEPENDENCIA = re.compile(r'\((\d+)\s*DIAS?\s+após\s+([^)]+?)\s*\)', re.IGNORECASE)
+# Abreviações usadas nos cabeçalhos -> nome curto da etapa
+APELIDOS_TAREFAS = {
+    'de': 'Design Educacional',
+    'dg': 'Design Gráfico',
+    'beta': 'Beta Tester',
+    'publicar': 'Publicação AVA',
+}
+
+def rotulo_tarefa(tarefa):
+    """Nome curto da etapa, sem o prazo relativo (ex: 'R1 - (3DIAS após DE)' -> 'R1')."""
+    return re.split(r'\s*[-(]', tarefa.strip(), maxsplit=1)[0].strip()
+
+@functools.lru_cache(maxsize=8)
+def grafo_dependencias(tarefas=None):
+    """
+    Grafo das etapas (índices em `tarefas`, padrão TAREFAS_PRINCIPAIS):
+    retorna ({etapa: (etapa anterior, dias)}, ordem topológica).
+    Levanta ValueError se um cabeçalho citar etapa inexistente ou houver ciclo.
+    """
+    tarefas = tuple(TAREFAS_PRINCIPAIS) if tarefas is None else tarefas
+    por_rotulo = {rotulo_tarefa(t).lower(): i for i, t in enumerate(tarefas)}
+
+    grafo = {}
+    for i, tarefa in enumerate(tarefas):
+        match = _PADRAO_DEPENDENCIA.search(tarefa)
+        if not match:
+            continue
+        citada = match.group(2).strip()
+        anterior = por_rotulo.get(APELIDOS_TAREFAS.get(citada.lower(), citada).lower())
+        if anterior is None:
+            raise ValueError(f"Etapa '{tarefa.strip()}' depende de '{citada}', que não está entre as tarefas.")
+        grafo[i] = (anterior, int(match.group(1)))
+
+    ordem, estado = [], {}  # estado: 1 = visitando, 2 = pronta
+    def visitar(i):
+        if estado.get(i) == 2:
+            return
+        if estado.get(i) == 1:
+            raise ValueError(f"Dependência circular envolvendo a etapa '{tarefas[i].strip()}'.")
+        estado[i] = 1
+        if i in grafo:
+            visitar(grafo[i][0])
+        estado[i] = 2
+        ordem.append(i)
+    for i in range(len(tarefas)):
+        visitar(i)
+    return grafo, ordem
+
+def calcular_prazos(ordens, planejado, realizado, abertas, referencia=None):
+    """
+    Data esperada e dias de atraso de cada etapa x curso, de uma vez para a aba toda.
+    `ordens` são os índices (em TAREFAS_PRINCIPAIS) das etapas presentes na aba;
+    `planejado` e `realizado` (datetime64[D], NaT sem data) e `abertas` (bool: ainda
+    pendente) têm uma linha por etapa de `ordens` e uma coluna por curso.
+
+    Esperada = a mais tarde entre a planejada e a conclusão da etapa anterior + N dias.
+    A conclusão de uma etapa é a data realizada; se ela segue aberta e já venceu, é hoje,
+    e o atraso empurra as etapas seguintes (quem está esperando não é cobrado por ele).
+    Retorna (esperado, dias_atraso), com o formato de `planejado`; atraso 0 se em dia.
+    """
+    hoje = np.datetime64(referencia or date.today(), 'D')
+    grafo, ordem = grafo_dependencias()
+    linha_da_etapa = {etapa: linha for linha, etapa in enumerate(ordens)}
+
+    esperado = planejado.copy()
+    dias_atraso = np.zeros(planejado.shape, dtype='int32')
+    conclusao = {}
+    for etapa in ordem:
+        linha = linha_da_etapa.get(etapa)
+        if linha is None:
+            continue  # etapa não existe nesta aba; as seguintes ficam só com o planejado
+        if etapa in grafo and grafo[etapa][0] in conclusao:
+            anterior, dias = grafo[etapa]
+            # fmax ignora NaT: sem data de um lado, vale a do outro
+            esperado[linha] = np.fmax(planejado[linha], conclusao[anterior] + np.timedelta64(dias, 'D'))
+
+        vencida = abertas[linha] & (esperado[linha] < hoje)
+        dias_atraso[linha] = np.where(vencida, (hoje - esperado[linha]).astype('int64'), 0)
+        conclusao[etapa] = np.where(
+            abertas[linha],
+            np.where(vencida, hoje, esperado[linha]),
+            np.where(np.isnat(realizado[linha]), esperado[linha], realizado[linha])
+        )
+    return esperado, dias_atraso
 
 # --- Lógica Principal (encontrar_pendencias) ---
 
-def encontrar_pendencias():
+class Pendencia:
     """
-    Conecta, carrega o DF e itera para encontrar as pendências.
-    (AGORA: ignora tarefas que já têm data em *_Realizado_Data)
+    Uma tarefa a cobrar: responsável, curso, tarefa, prazo ('dd/mm' em `dia` e
+    datetime.date em `prazo`, None se não for data), linha no Sheets e a fonte
+    (planilha/aba) de onde veio. `esperado` é a data esperada considerando as
+    etapas anteriores e `dias_atraso` o atraso em relação a ela (ver calcular_prazos).
+    Usa __slots__: sem um dict por pendência.
     """
-    start_time = time.time()
-    print("\n--- INICIANDO VERIFICAÇÃO DE PENDÊNCIAS (Google Sheets) ---")
+    __slots__ = ('pessoa', 'curso', 'tarefa', 'dia', 'row_index', 'fonte', 'prazo', 'esperado', 'dias_atraso')
 
-    try:
-        worksheet = conectar_sheets()
-        df = carregar_dataframe(worksheet)
-        
-    except Exception as e:
-        print(f"--- ERRO FATAL AO CARREGAR OS DADOS ---")
-        print(f"Erro: {e}")
-        print("Verificação abortada.")
-        return [] 
-    
-    df = df.dropna(subset=['Componente Curricular'])
-    print(f"[LOG] {len(df)} linhas de cursos válidos encontradas.")
-    
-    pendencias = []
-    total_tarefas_checadas = 0
-    
-    print("\n--- INICIANDO ANÁLISE DETALHADA (Linha por Linha) ---")
-    
-    for index, row in df.iterrows():
-        curso_bruto = row.get('Componente Curricular', '')
-        if pd.isna(curso_bruto) or not curso_bruto:
+    def __init__(self, pessoa, curso, tarefa, dia, row_index, fonte=None, prazo=None, esperado=None, dias_atraso=0):
+        self.pessoa = pessoa
+        self.curso = curso
+        self.tarefa = tarefa
+        self.dia = dia
+        self.row_index = row_index
+        self.fonte = fonte
+        self.prazo = prazo
+        self.esperado = esperado
+        self.dias_atraso = dias_atraso
+
+    def _campos(self):
+        return (
+            self.pessoa, self.curso, self.tarefa, self.dia, self.row_index, self.fonte,
+            self.prazo, self.esperado, self.dias_atraso
+        )
+
+    def __eq__(self, outra):
+        return isinstance(outra, Pendencia) and self._campos() == outra._campos()
+
+    def __repr__(self):
+        return (
+            f"Pendencia(pessoa={self.pessoa!r}, curso={self.curso!r}, tarefa={self.tarefa!r}, "
+            f"dia={self.dia!r}, prazo={self.prazo!r}, esperado={self.esperado!r}, dias_atraso={self.dias_atraso}, "
+            f"row_index={self.row_index}, fonte={self.fonte!r})"
+        )
+
+# Respostas que indicam que a tarefa não tem responsável a ser cobrado
+RESPONSAVEIS_INVALIDOS = ['-', 'FINALIZADO', '']
+# Valores de *_Realizado_Data que contam como "sem data de realização"
+REALIZADO_VAZIO = ["", "N/A", "nan"]
+
+def _texto_limpo(serie):
+    """Equivalente colunar de `str(v).strip()` apenas para células de texto; o resto vira ''."""
+    return serie.str.strip().fillna('')
+
+def _coluna(df, nome):
+    """Valores da coluna `nome`; se o cabeçalho gerou nomes repetidos, usa a primeira."""
+    coluna = df[nome]
+    if isinstance(coluna, pd.DataFrame):
+        coluna = coluna.iloc[:, 0]
+    return coluna.to_numpy(dtype=object)
+
+def _registrar_trace(longo, cursos, linhas, tarefas, responsavel_valido, sem_realizado, status_true):
+    """Trace por (curso, tarefa), só para os cursos de LOG_TRACE_CURSOS ou sorteados por LOG_TRACE_AMOSTRA."""
+    escolhidos = [pos for pos, curso in enumerate(cursos) if curso_no_trace(curso)]
+    if not escolhidos:
+        return
+    for i in longo.index[longo['posicao'].isin(escolhidos)]:
+        if not responsavel_valido[i]:
+            resultado = "IGNORADO (Responsável inválido ou FINALIZADO)"
+        elif not sem_realizado[i]:
+            resultado = "IGNORADO (Já possui data de realização)"
+        elif status_true[i]:
+            resultado = "PENDÊNCIA ENCONTRADA!"
+        else:
+            resultado = "OK (Status não é TRUE)"
+        posicao = longo.at[i, 'posicao']
+        log_trace.debug(
+            "[CURSO] %s (Linha Sheets: %s) -> [TAREFA] %-30s | Resp: '%s' | Status: '%s' | Realizado: '%s' -> %s",
+            cursos[posicao], linhas[posicao], tarefas[longo.at[i, 'ordem']], longo.at[i, 'pessoa'],
+            longo.at[i, 'status'], longo.at[i, 'realizado'], resultado
+        )
+
+@metricas.cronometrar('analise')
+def analisar_pendencias(df, referencia=None):
+    """
+    Motor colunar de pendências.
+    Empilha os grupos <tarefa>_Resp/_Status/_Planejado/_Realizado_Data numa tabela
+    longa (uma linha por curso x tarefa) e aplica os filtros de uma vez:
+    responsável inválido, data de realização preenchida e status == TRUE.
+    Datas esperadas e atrasos saem do motor de prazos (calcular_prazos), com
+    `referencia` (padrão: hoje) como o dia de hoje.
+    Retorna as Pendencias na mesma ordem da antiga varredura linha a linha.
+    """
+    cursos = df['Componente Curricular']
+    base = df.loc[cursos.notna() & cursos.astype(bool)]
+    posicoes = range(len(base))
+
+    blocos = []
+    ordens = []
+    for ordem, tarefa in enumerate(TAREFAS_PRINCIPAIS):
+        col_resp = f'{tarefa}_Resp'
+        col_status = f'{tarefa}_Status'
+        col_planejado = f'{tarefa}_Planejado'
+        col_realizado = f'{tarefa}_Realizado_Data'
+
+        # Etapa não se aplica a esta planilha
+        if any(c not in df.columns for c in [col_resp, col_status, col_planejado]):
             continue
-        curso = str(curso_bruto).strip()
-        
-        print(f"\n[CURSO] {curso} (Linha Sheets: {row['indice_linha_sheets']})")
-        
-        for tarefa in TAREFAS_PRINCIPAIS:
-            total_tarefas_checadas += 1
-            
-            col_resp = f'{tarefa}_Resp'
-            col_status = f'{tarefa}_Status'
-            col_planejado = f'{tarefa}_Planejado'
-            col_realizado = f'{tarefa}_Realizado_Data'  # <- NOVA CHECAGEM AQUI
-            
-            # Verifica se as colunas necessárias existem
-            if any(c not in df.columns for c in [col_resp, col_status, col_planejado]):
-                continue
-                
-            pessoa = row.get(col_resp)
-            status_bruto = row.get(col_status)
-            data_realizado = row.get(col_realizado) if col_realizado in df.columns else None
-            data_planejada = normalizar_data(row.get(col_planejado, "N/A"))
-            
-            log_prefix = f"  -> [TAREFA] {tarefa:<30}"
-            print(f"{log_prefix} | Resp: '{pessoa}' | Status: '{status_bruto}' | Realizado: '{data_realizado}'")
-            
-            pessoa_str = str(pessoa).strip()
-            if pd.isna(pessoa) or pessoa_str in ['-', 'FINALIZADO', '']:
-                print(f"     -> IGNORADO (Responsável inválido ou FINALIZADO)")
-                continue
-            
-            status_str = str(status_bruto).upper().strip()
-            data_realizado_str = str(data_realizado).strip() if isinstance(data_realizado, str) else ""
-            
-            # ⚠️ SE JÁ TEM DATA DE REALIZAÇÃO, IGNORA
-            if data_realizado_str not in ["", "N/A", "nan"]:
-                print(f"     -> IGNORADO (Já possui data de realização: '{data_realizado_str}')")
-                continue
 
-            # ✅ Só conta como pendência se o status for 'TRUE' e não tiver data em Realizado
-            if status_str == 'TRUE':
-                print(f"     -> PENDÊNCIA ENCONTRADA! (Responsável: {pessoa_str})")
-                pendencias.append({
-                    "pessoa": pessoa_str,
-                    "curso": curso,
-                    "tarefa": tarefa.strip(),
-                    "dia": data_planejada,
-                    "row_index": row['indice_linha_sheets']
-                })
-            else:
-                print(f"     -> OK (Status: '{status_str}')")
+        blocos.append(pd.DataFrame({
+            'posicao': posicoes,
+            'ordem': ordem,
+            'pessoa': _coluna(base, col_resp),
+            'status': _coluna(base, col_status),
+            'planejado': _coluna(base, col_planejado),
+            'realizado': _coluna(base, col_realizado) if col_realizado in df.columns else '',
+        }))
+        ordens.append(ordem)
 
-    end_time = time.time()
-    print("\n--- VERIFICAÇÃO CONCLUÍDA ---")
-    print(f"Tempo de execução: {end_time - start_time:.2f} segundos")
-    print(f"Total de tarefas checadas: {total_tarefas_checadas}")
-    print(f"Total de pendências encontradas: {len(pendencias)}")
-    return pendencias
+    if not blocos or base.empty:
+        return []
+
+    longo = pd.concat(blocos, ignore_index=True)
+
+    pessoa = longo['pessoa'].astype(str).str.strip()
+    responsavel_valido = longo['pessoa'].notna() & ~pessoa.isin(RESPONSAVEIS_INVALIDOS)
+    sem_realizado = _texto_limpo(longo['realizado']).isin(REALIZADO_VAZIO)
+    status_true = longo['status'].astype(str).str.upper().str.strip() == 'TRUE'
+
+    longo['pessoa'] = pessoa
+    abertas = responsavel_valido & sem_realizado & status_true
+    pend = longo[abertas]
+    pend = pend.sort_values(['posicao', 'ordem'], kind='stable')
+
+    cursos_limpos = base['Componente Curricular'].astype(str).str.strip().to_numpy()
+    linhas = base['indice_linha_sheets'].to_numpy()
+    tarefas = [t.strip() for t in TAREFAS_PRINCIPAIS]
+
+    if trace_ativo():
+        _registrar_trace(longo, cursos_limpos, linhas, tarefas, responsavel_valido, sem_realizado, status_true)
+
+    # Datas de todas as etapas x cursos (só os valores distintos passam pela conversão),
+    # em matrizes etapa x curso: o índice da tabela longa é etapa * cursos + curso
+    formato = (len(ordens), len(base))
+    dias, planejado = normalizar_coluna(longo['planejado'].to_numpy(), referencia)
+    _, realizado = normalizar_coluna(longo['realizado'].to_numpy(), referencia)
+    esperado, dias_atraso = calcular_prazos(
+        ordens, planejado.reshape(formato), realizado.reshape(formato),
+        abertas.to_numpy().reshape(formato), referencia
+    )
+
+    indices = pend.index.to_numpy()
+    return [
+        Pendencia(
+            pessoa=pessoa_str,
+            curso=cursos_limpos[posicao],
+            tarefa=tarefas[ordem],
+            dia=dia,
+            row_index=int(linhas[posicao]),
+            prazo=prazo,
+            esperado=esperado_,
+            dias_atraso=int(atraso)
+        )
+        for posicao, ordem, pessoa_str, dia, prazo, esperado_, atraso in zip(
+            pend['posicao'], pend['ordem'], pend['pessoa'], dias[indices],
+            planejado[indices].astype(object), esperado.ravel()[indices].astype(object),
+            dias_atraso.ravel()[indices]
+        )
+    ]
 
+def _ler_fonte(conexao, incremental, linhas_por_bloco, usar_cache=False):
     """
-    Conecta, carrega o DF e itera para encontrar as pendências.
-    (CORREÇÃO 4: Agora procura pela coluna _Status)
+    Lê uma fonte. Incremental ou em blocos: retorna (pendências já analisadas, tarefas checadas).
+    Completo: retorna (DataFrame dos cursos válidos, tarefas checadas) para a análise; com
+    `usar_cache` pode vir do snapshot em disco, senão é sempre uma leitura nova (que regrava o snapshot).
     """
-    start_time = time.time()
-    print("\n--- INICIANDO VERIFICAÇÃO DE PENDÊNCIAS (Google Sheets) ---")
+    if incremental:
+        pendencias = conexao.executar(conexao.sincronizador.sincronizar)
+        return pendencias, conexao.sincronizador.linhas_reanalisadas * len(TAREFAS_PRINCIPAIS)
+
+    if linhas_por_bloco:
+        estatisticas = {}
+        pendencias = list(iterar_pendencias(conexao, linhas_por_bloco, estatisticas))
+        log.info(
+            "Fonte %s ('%s'): %d linhas de cursos válidos lidas em %d bloco(s).",
+            conexao.fonte, conexao.sheet_name, estatisticas['cursos'], estatisticas['blocos']
+        )
+        return pendencias, estatisticas['cursos'] * len(TAREFAS_PRINCIPAIS)
+
+    df = carregar_dataframe_cache(conexao) if usar_cache else _recarregar_cache(conexao)
+    df = df.dropna(subset=['Componente Curricular'])
+    log.info("Fonte %s ('%s'): %d linhas de cursos válidos encontradas.", conexao.fonte, conexao.sheet_name, len(df))
+    return df, int(df['Componente Curricular'].astype(bool).sum()) * len(TAREFAS_PRINCIPAIS)
 
+_executor_analise = None
+
+def _pool_analise(quantidade_fontes):
+    """Pool de processos da análise, criado no primeiro uso com mais de uma fonte."""
+    global _executor_analise
+    with _conexoes_lock:
+        if _executor_analise is None:
+            processos = ANALISE_PROCESSOS or min(quantidade_fontes, os.cpu_count() or 1)
+            # 'spawn': o processo do bot já tem threads (gateway, pool do Sheets), e fork com threads não é seguro.
+            # O processo novo não herda a configuração de logs: sem ela, o trace (LOG_TRACE_*) não sairia
+            _executor_analise = ProcessPoolExecutor(
+                max_workers=processos, mp_context=multiprocessing.get_context('spawn'), initializer=configurar_logging
+            )
+        return _executor_analise
+
+def _analisar_em_processo(df):
+    """Roda no processo da análise: retorna (pendências, segundos), pois as métricas de lá não chegam ao bot."""
+    inicio = time.perf_counter()
+    return analisar_pendencias(df), time.perf_counter() - inicio
+
+def _analisar_fontes(dataframes):
+    """
+    Analisa os DataFrames das fontes; com mais de um, em processos paralelos.
+    O tempo de cada análise feita nos processos entra em 'analise' por aqui,
+    e o total da etapa em 'analise_paralela'.
+    """
+    if len(dataframes) < 2:
+        return [analisar_pendencias(df) for df in dataframes]
     try:
-        worksheet = conectar_sheets()
-        df = carregar_dataframe(worksheet)
-        
+        with metricas.cronometrar('analise_paralela'):
+            resultados = list(_pool_analise(len(dataframes)).map(_analisar_em_processo, dataframes))
+        for _, segundos in resultados:
+            metricas.observar('analise', segundos)
+        return [pendencias for pendencias, _ in resultados]
     except Exception as e:
-        print(f"--- ERRO FATAL AO CARREGAR OS DADOS ---")
-        print(f"Erro: {e}")
-        print("Verificação abortada.")
-        return [] 
-    
-    df = df.dropna(subset=['Componente Curricular'])
-    print(f"[LOG] {len(df)} linhas de cursos válidos encontradas.")
-    
+        log.warning("Falha na análise em processos paralelos (%s). Analisando em sequência...", e)
+        return [analisar_pendencias(df) for df in dataframes]
+
+def encontrar_pendencias(incremental=None, linhas_por_bloco=None, usar_cache=False, fontes_lidas=None):
+    """
+    Conecta, carrega o DF e analisa as pendências com o motor colunar.
+    (Ignora tarefas que já têm data em *_Realizado_Data)
+    Com `incremental` (padrão: SYNC_INCREMENTAL) reaproveita o último snapshot
+    e reanalisa só as linhas que mudaram. Com `linhas_por_bloco` (padrão:
+    LINHAS_POR_BLOCO) lê e analisa a aba em blocos (ver iterar_pendencias).
+    Com `usar_cache`, a leitura completa pode vir do snapshot em disco (ver
+    carregar_dataframe_cache): só para consultas, nunca para a verificação que envia DMs.
+    Com várias FONTES, lê todas ao mesmo tempo, analisa em processos paralelos e
+    junta as pendências na ordem das fontes, cada uma marcada com a sua 'fonte'.
+    `fontes_lidas`, se passado (set), recebe a 'fonte' de cada leitura que deu certo,
+    inclusive das que não têm nenhuma pendência.
+    """
+    if incremental is None:
+        incremental = SYNC_INCREMENTAL
+    if linhas_por_bloco is None:
+        linhas_por_bloco = LINHAS_POR_BLOCO
+
+    start_time = time.time()
+    log.info("--- INICIANDO VERIFICAÇÃO DE PENDÊNCIAS (Google Sheets) ---")
+    conexoes = [obter_conexao(sheet_id, sheet_name) for sheet_id, sheet_name in obter_fontes()]
+
+    def _ler(conexao):
+        try:
+            return _ler_fonte(conexao, incremental, linhas_por_bloco, usar_cache)
+        except Exception as e:
+            log.error("Erro fatal ao carregar os dados da fonte %s ('%s'): %s. Fonte ignorada nesta verificação.", conexao.fonte, conexao.sheet_name, e)
+            return None
+
+    if len(conexoes) == 1:
+        leituras = [_ler(conexoes[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(conexoes), thread_name_prefix='fonte') as leitores:
+            leituras = list(leitores.map(_ler, conexoes))
+
+    lidas = [(conexao, leitura) for conexao, leitura in zip(conexoes, leituras) if leitura is not None]
+    if fontes_lidas is not None:
+        fontes_lidas.update(conexao.fonte for conexao, _ in lidas)
+    if not lidas:
+        log.error("Nenhuma fonte pôde ser carregada. Verificação abortada.")
+        return []
+
+    # Leituras que vieram como DataFrame ainda precisam da análise; as demais já são pendências
+    resultados = [dados for _, (dados, _) in lidas]
+    a_analisar = [i for i, dados in enumerate(resultados) if isinstance(dados, pd.DataFrame)]
+    if a_analisar:
+        log.info("Iniciando análise colunar de %d fonte(s)...", len(a_analisar))
+        for i, lista in zip(a_analisar, _analisar_fontes([resultados[i] for i in a_analisar])):
+            resultados[i] = lista
+
     pendencias = []
-    total_tarefas_checadas = 0
-    
-    print("\n--- INICIANDO ANÁLISE DETALHADA (Linha por Linha) ---")
-    
-    for index, row in df.iterrows():
-        curso_bruto = row.get('Componente Curricular', '')
-        if pd.isna(curso_bruto) or not curso_bruto:
-            continue
-        curso = str(curso_bruto).strip()
-        
-        print(f"\n[CURSO] {curso} (Linha Sheets: {row['indice_linha_sheets']})")
-        
-        for tarefa in TAREFAS_PRINCIPAIS:
-            total_tarefas_checadas += 1
-            
-            # Nomes das colunas corrigidos
-            col_resp = f'{tarefa}_Resp'
-            col_status = f'{tarefa}_Status' # CORRIGIDO
-            col_data = f'{tarefa}_Planejado'
-            
-            # A verificação agora deve funcionar
-            if col_resp not in df.columns or col_data not in df.columns or col_status not in df.columns:
-                # print(f"  -> [TAREFA] {tarefa:<30} | IGNORADO (Etapa não se aplica a este curso)")
-                continue
-                
-            pessoa = row.get(col_resp)
-            status_bruto = row.get(col_status)
-            
-            log_prefix = f"  -> [TAREFA] {tarefa:<30}"
-            print(f"{log_prefix} | Lendo Resp: '{pessoa}' | Lendo Status: '{status_bruto}'")
-            
-            pessoa_str = str(pessoa).strip()
-            if pd.isna(pessoa) or pessoa_str in ['-', 'FINALIZADO', '']:
-                print(f"     -> IGNORADO (Responsável inválido ou 'FINALIZADO')")
-                continue
-            
-            pessoa_limpo = pessoa_str
-            status_str = str(status_bruto).upper().strip()
-            data_planejada = normalizar_data(row.get(col_data, "N/A"))
-
-
-            # Encontrada pendência (Status é 'TRUE')
-            if status_str == 'TRUE':
-                print(f"     -> PENDÊNCIA ENCONTRADA! (Responsável: {pessoa_limpo})")
-                pendencia = {
-                    "pessoa": pessoa_limpo,
-                    "curso": curso,
-                    "tarefa": tarefa.strip(),
-                    "dia": data_planejada,
-                    "row_index": row['indice_linha_sheets'] 
-                }
-                pendencias.append(pendencia)
-            else:
-                print(f"     -> OK (Status: '{status_str}')")
+    for (conexao, _), lista in zip(lidas, resultados):
+        for p in lista:
+            p.fonte = conexao.fonte
+        pendencias.extend(lista)
+    total_tarefas_checadas = sum(checadas for _, (_, checadas) in lidas)
 
     end_time = time.time()
-    print("\n--- VERIFICAÇÃO CONCLUÍDA ---")
-    print(f"Tempo de execução: {end_time - start_time:.2f} segundos")
-    print(f"Total de tarefas individuais checadas: {total_tarefas_checadas}")
-    print(f"Total de pendências encontradas: {len(pendencias)}")
+    metricas.incrementar('pendencias_encontradas', len(pendencias))
+    log.info(
+        "Verificação concluída em %.2f segundos: %d fonte(s), %d tarefas checadas, %d pendências encontradas (%d com prazo vencido).",
+        end_time - start_time, len(lidas), total_tarefas_checadas, len(pendencias), len(pendencias_atrasadas(pendencias)), extra=RESUMO
+    )
     return pendencias
 
+# --- Leitura em Blocos (streaming) ---
+
+def _ler_bloco(worksheet, layout, inicio, fim):
+    """Linhas `inicio`..`fim` (1-based) da aba, até a última coluna útil do cabeçalho."""
+    with metricas.cronometrar('leitura_bloco'):
+        return cota_sheets.ler(worksheet.get, f"A{inicio}:{_letra_coluna(layout.largura_util)}{fim}")
+
+def _dataframe_bloco(layout, linhas, inicio):
+    """DataFrame de um bloco de linhas (a API corta células vazias no final de cada linha)."""
+    largura = layout.largura_util
+    df = pd.DataFrame(
+        [linha + [''] * (largura - len(linha)) for linha in linhas],
+        columns=layout.colunas[:largura]
+    )
+    df = df.drop(columns=[''], errors='ignore')
+    df['indice_linha_sheets'] = np.arange(inicio, inicio + len(df), dtype='int32')
+    return df
+
+def iterar_pendencias(conexao=None, linhas_por_bloco=None, estatisticas=None):
+    """
+    Gerador de Pendencias que lê a aba em blocos de `linhas_por_bloco` linhas
+    (padrão LINHAS_POR_BLOCO, ou 2000). O cabeçalho é lido uma vez (obter_layout);
+    cada bloco é montado e analisado assim que chega, enquanto o próximo já está
+    sendo baixado. Só ~2 blocos ficam em memória ao mesmo tempo.
+    `estatisticas`, se passado, recebe 'blocos' e 'cursos' (linhas com curso).
+    """
+    conexao = conexao or conexao_da_fonte()
+    linhas_por_bloco = linhas_por_bloco or LINHAS_POR_BLOCO or 2000
+    estatisticas = {} if estatisticas is None else estatisticas
+    estatisticas.update(blocos=0, cursos=0)
+
+    layout = conexao.executar(obter_layout)
+    # Tamanho da grade da aba (vem nos metadados, sem requisição extra). O handle é de
+    # longa duração e esse número fica desatualizado quando a aba ganha linhas: serve
+    # só de piso, a leitura segue além dele até o primeiro bloco vazio.
+    total_linhas = getattr(conexao.worksheet(), 'row_count', None) or 0
+    alem_da_grade = False
+
+    def baixar(inicio):
+        return conexao.executar(_ler_bloco, layout, inicio, inicio + linhas_por_bloco - 1)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='bloco') as leitor:
+        inicio = 3
+        proximo = leitor.submit(baixar, inicio)
+        while proximo is not None:
+            linhas = proximo.result()
+            seguinte = inicio + linhas_por_bloco
+            # Vai até o fim da grade conhecida (linhas em branco no meio não encerram a leitura)
+            # e, depois dela, até o primeiro bloco vazio. O próximo já vai sendo baixado.
+            if seguinte <= total_linhas or linhas:
+                proximo = leitor.submit(baixar, seguinte)
+            else:
+                proximo = None
+
+            if linhas:
+                if inicio + len(linhas) - 1 > total_linhas and not alem_da_grade:
+                    alem_da_grade = True
+                    log.info("A aba tem linhas além das %d do tamanho em cache; lendo até o fim.", total_linhas)
+                df = _dataframe_bloco(layout, linhas, inicio)
+                estatisticas['blocos'] += 1
+                estatisticas['cursos'] += int(df['Componente Curricular'].astype(bool).sum())
+                log.debug("Bloco de linhas %d-%d lido (%d linhas).", inicio, inicio + len(linhas) - 1, len(linhas))
+                yield from analisar_pendencias(df)
+            inicio = seguinte
+
+# --- Sincronização Incremental ---
+
+def _letra_coluna(coluna):
+    """Letra(s) A1 da coluna 1-based (ex: 1 -> 'A', 28 -> 'AB')."""
+    return re.sub(r'\d', '', gspread_utils.rowcol_to_a1(1, coluna))
+
+def _intervalos_relevantes(layout):
+    """
+    Blocos contíguos de colunas que a análise usa ('Componente Curricular' e os
+    grupos das tarefas). Retorna [(inicio, fim)] 0-based e os ranges A1 a partir da linha 3.
+    """
+    prefixos = tuple(f'{tarefa}_' for tarefa in TAREFAS_PRINCIPAIS)
+    indices = [
+        i for i, nome in enumerate(layout.colunas[:layout.largura_util])
+        if nome == 'Componente Curricular' or nome.startswith(prefixos)
+    ]
+
+    blocos = []
+    for i in indices:
+        if blocos and blocos[-1][1] == i - 1:
+            blocos[-1][1] = i
+        else:
+            blocos.append([i, i])
+
+    intervalos = [f"{_letra_coluna(ini + 1)}3:{_letra_coluna(fim + 1)}" for ini, fim in blocos]
+    return [tuple(b) for b in blocos], intervalos
+
+class SincronizadorPlanilha:
+    """
+    Mantém o último snapshot da aba (hash do conteúdo relevante de cada linha e as
+    pendências de cada linha). A cada sincronização baixa só as colunas que a
+    análise usa, num único batch_get junto com o cabeçalho, e reanalisa apenas as
+    linhas novas ou alteradas. Se o cabeçalho mudar, o snapshot é descartado; na
+    virada do dia todas as linhas são reanalisadas (os atrasos dependem da data).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._impressao_digital = None
+        self._hashes = {}                # linha do Sheets -> hash das células relevantes
+        self._pendencias_por_linha = {}  # linha do Sheets -> [pendências]
+        self._referencia = None          # dia da última análise (atrasos dependem de "hoje")
+        self.linhas_reanalisadas = 0
+
+    def sincronizar(self, worksheet):
+        """Atualiza o snapshot e retorna todas as pendências, na ordem da planilha."""
+        with self._lock:
+            with _layouts_lock:
+                layout = _layouts.get(_chave_aba(worksheet))
+            if layout is None:
+                layout = obter_layout(worksheet)
+
+            for _ in range(2):
+                blocos, intervalos = _intervalos_relevantes(layout)
+                log.info("Sync incremental: lendo cabeçalho + %d bloco(s) de colunas (%s)...", len(intervalos), intervalos)
+                valores = cota_sheets.ler(worksheet.batch_get, ['1:2'] + intervalos)
+                cabecalho = valores[0]
+                headers_row_1 = cabecalho[0] if len(cabecalho) > 0 else []
+                headers_row_2 = cabecalho[1] if len(cabecalho) > 1 else []
+                if impressao_digital_cabecalho(headers_row_1, headers_row_2) == layout.impressao_digital:
+                    break
+                log.info("Sync incremental: cabeçalho alterado. Refazendo layout...")
+                layout = LayoutCabecalho(headers_row_1, headers_row_2)
+                _registrar_layout(worksheet, layout)
+            else:
+                raise Exception("Cabeçalho da planilha mudou durante a sincronização.")
+
+            layout.verificado_em = time.time()
+            if layout.impressao_digital != self._impressao_digital:
+                log.info("Sync incremental: snapshot novo (primeira carga ou cabeçalho mudou).")
+                self._impressao_digital = layout.impressao_digital
+                self._hashes = {}
+                self._pendencias_por_linha = {}
+            elif self._referencia != date.today():
+                # Virou o dia: datas esperadas e atrasos mudam mesmo nas linhas intactas
+                log.info("Sync incremental: novo dia, reanalisando todas as linhas.")
+                self._hashes = {}
+            self._referencia = date.today()
+
+            # Remonta as linhas só com as colunas relevantes (a API corta células vazias no final)
+            total_linhas = max((len(v) for v in valores[1:]), default=0)
+            linhas = [[] for _ in range(total_linhas)]
+            for (ini, fim), bloco in zip(blocos, valores[1:]):
+                largura = fim - ini + 1
+                for r in range(total_linhas):
+                    celulas = bloco[r] if r < len(bloco) else []
+                    linhas[r].extend(celulas + [''] * (largura - len(celulas)))
+            nomes = [layout.colunas[i] for ini, fim in blocos for i in range(ini, fim + 1)]
+
+            hashes = {r + 3: hash(tuple(linha)) for r, linha in enumerate(linhas)}
+            alteradas = [r for r, h in hashes.items() if self._hashes.get(r) != h]
+            removidas = [r for r in self._pendencias_por_linha if r not in hashes]
+
+            for r in removidas:
+                del self._pendencias_por_linha[r]
+
+            if alteradas:
+                df = pd.DataFrame([linhas[r - 3] for r in alteradas], columns=nomes)
+                df['indice_linha_sheets'] = alteradas
+                for r in alteradas:
+                    self._pendencias_por_linha[r] = []
+                for p in analisar_pendencias(df):
+                    self._pendencias_por_linha[p.row_index].append(p)
+
+            self._hashes = hashes
+            self.linhas_reanalisadas = len(alteradas)
+            log.info(
+                "Sync incremental: %d linha(s) nova(s)/alterada(s) e %d removida(s) de %d.",
+                len(alteradas), len(removidas), total_linhas, extra=RESUMO
+            )
+
+            return [
+                p
+                for r in sorted(self._pendencias_por_linha)
+                for p in self._pendencias_por_linha[r]
+            ]
+
+# --- Camada Assíncrona (para uso dentro do bot) ---
+# gspread é bloqueante: estas versões rodam as funções acima num pool limitado de
+# threads para que o gateway do Discord continue respondendo durante o HTTP.
+
+_executor_sheets = ThreadPoolExecutor(max_workers=SHEETS_MAX_WORKERS, thread_name_prefix='sheets')
+
+async def _executar_no_pool(func, *args, **kwargs):
+    """Agenda `func` no pool do Sheets e aguarda o resultado sem travar o event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor_sheets, functools.partial(func, *args, **kwargs))
+
+async def conectar_sheets_async():
+    """Versão aguardável de conectar_sheets()."""
+    return await _executar_no_pool(conectar_sheets)
+
+async def carregar_dataframe_async(worksheet):
+    """Versão aguardável de carregar_dataframe()."""
+    return await _executar_no_pool(carregar_dataframe, worksheet)
+
+async def encontrar_pendencias_async(usar_cache=False, fontes_lidas=None):
+    """Versão aguardável de encontrar_pendencias() (leitura + análise completas)."""
+    return await _executar_no_pool(encontrar_pendencias, usar_cache=usar_cache, fontes_lidas=fontes_lidas)
+
+async def atualizar_status_sheets_async(row_index, tarefa, novo_status, fonte=None):
+    """Versão aguardável de atualizar_status_sheets(); aguarda o lote sem ocupar o pool."""
+    return await asyncio.wrap_future(enfileirar_atualizacao(row_index, tarefa, novo_status, fonte))
+
 # --- Para testar este script diretamente ---
 if __name__ == "__main__":
+    configurar_logging()
     
     lista_de_pendencias = encontrar_pendencias()
     
     if lista_de_pendencias:
         print("\n--- RESUMO DE PENDÊNCIAS (Primeiras 10) ---")
         for item in lista_de_pendencias[:10]:
-            print(f"  [PENDENTE] Pessoa: {item['pessoa']}, Curso: {item['curso']}, Tarefa: {item['tarefa']}, Prazo: {item['dia']}, Linha Sheets: {item['row_index']}")
+            print(f"  [PENDENTE] Pessoa: {item.pessoa}, Curso: {item.curso}, Tarefa: {item.tarefa}, Prazo: {item.dia}, Linha Sheets: {item.row_index}")
     else:
         print("\n--- RESUMO DE PENDÊNCIAS ---")
         print("  Nenhuma pendência encontrada.")
\ No newline at end of file
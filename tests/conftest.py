@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Os módulos do bot ficam na raiz do projeto (sem pacote): deixa-os importáveis
+# também quando o pytest é chamado de fora dela.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
@@ -0,0 +1,28 @@
+from estado_lembretes import EstadoLembretes
+from processador_csv import Pendencia
+
+# --- Estado dos lembretes: o que é cobrado de novo e o que é esquecido ---
+
+def pendencia(fonte='f1', linha=5, pessoa='Ana'):
+    return Pendencia(pessoa, 'Curso A', 'Design Educacional', '03/11', linha, fonte=fonte)
+
+def test_tarefa_reaberta_em_fonte_sem_pendencias_volta_como_nova(tmp_path):
+    estado = EstadoLembretes(str(tmp_path / 'lembretes.sqlite3'), repetir_horas=24)
+    p = pendencia()
+    estado.registrar_envios([p], agora=1000)
+
+    # A fonte foi lida e não tem mais nenhuma pendência
+    assert estado.esquecer_resolvidas([], fontes={'f1'}) == 1
+
+    _, contagem = estado.selecionar([p], agora=1000 + 2 * 3600)
+    assert contagem['novas'] == 1
+
+def test_fonte_que_nao_foi_lida_mantem_o_estado(tmp_path):
+    estado = EstadoLembretes(str(tmp_path / 'lembretes.sqlite3'), repetir_horas=24)
+    p = pendencia(fonte='f1')
+    estado.registrar_envios([p], agora=1000)
+
+    assert estado.esquecer_resolvidas([pendencia(fonte='f2')], fontes={'f2'}) == 0
+
+    _, contagem = estado.selecionar([p], agora=1000 + 2 * 3600)
+    assert contagem['em_dia'] == 1
@@ -0,0 +1,127 @@
+import random
+import pandas as pd
+import pytest
+import cota_sheets
+import processador_csv
+from processador_csv import (
+    TAREFAS_PRINCIPAIS, analisar_pendencias, carregar_dataframe, iterar_pendencias, normalizar_data,
+)
+from benchmarks.planilha_falsa import ConexaoFalsa, PlanilhaFalsa, gerar_planilha
+
+# --- Paridade do motor colunar com a varredura linha a linha ---
+# `varredura_original` é a cópia do laço com iterrows que o analisar_pendencias
+# substituiu (sem os prints). As duas têm que devolver as mesmas pendências, na
+# mesma ordem, para qualquer planilha.
+
+def varredura_original(df):
+    df = df.dropna(subset=['Componente Curricular'])
+    pendencias = []
+    for index, row in df.iterrows():
+        curso_bruto = row.get('Componente Curricular', '')
+        if pd.isna(curso_bruto) or not curso_bruto:
+            continue
+        curso = str(curso_bruto).strip()
+
+        for tarefa in TAREFAS_PRINCIPAIS:
+            col_resp = f'{tarefa}_Resp'
+            col_status = f'{tarefa}_Status'
+            col_planejado = f'{tarefa}_Planejado'
+            col_realizado = f'{tarefa}_Realizado_Data'
+
+            if any(c not in df.columns for c in [col_resp, col_status, col_planejado]):
+                continue
+
+            pessoa = row.get(col_resp)
+            status_bruto = row.get(col_status)
+            data_realizado = row.get(col_realizado) if col_realizado in df.columns else None
+            data_planejada = normalizar_data(row.get(col_planejado, "N/A"))
+
+            pessoa_str = str(pessoa).strip()
+            if pd.isna(pessoa) or pessoa_str in ['-', 'FINALIZADO', '']:
+                continue
+
+            status_str = str(status_bruto).upper().strip()
+            data_realizado_str = str(data_realizado).strip() if isinstance(data_realizado, str) else ""
+
+            if data_realizado_str not in ["", "N/A", "nan"]:
+                continue
+
+            if status_str == 'TRUE':
+                pendencias.append({
+                    "pessoa": pessoa_str,
+                    "curso": curso,
+                    "tarefa": tarefa.strip(),
+                    "dia": data_planejada,
+                    "row_index": row['indice_linha_sheets']
+                })
+    return pendencias
+
+def como_dicts(pendencias):
+    return [
+        {"pessoa": p.pessoa, "curso": p.curso, "tarefa": p.tarefa, "dia": p.dia, "row_index": p.row_index}
+        for p in pendencias
+    ]
+
+def misturar_casos_de_borda(valores, semente):
+    """Mistura nos dados os casos de borda: responsáveis inválidos, status e datas de realização variados, cursos em branco."""
+    rnd = random.Random(semente)
+    largura = len(valores[0])
+    for linha in valores[2:]:
+        linha.extend([''] * (largura - len(linha)))
+        if rnd.random() < 0.05:
+            linha[1] = rnd.choice(['', '   ', ' Curso com espaços '])
+        for coluna in range(4, largura, 4):
+            sorteio = rnd.random()
+            if sorteio < 0.1:
+                linha[coluna] = rnd.choice(['-', 'FINALIZADO', '', '  ', ' - ', 'finalizado'])
+            elif sorteio < 0.2:
+                linha[coluna + 2] = rnd.choice(['N/A', 'nan', '  ', ' N/A ', '-', '12/out'])
+            elif sorteio < 0.3:
+                linha[coluna + 3] = rnd.choice(['true', ' TRUE ', 'True', 'FALSE', '', 'sim'])
+    return valores
+
+@pytest.fixture(autouse=True)
+def sem_limite_de_cota(monkeypatch):
+    monkeypatch.setattr(cota_sheets, 'gerenciador', cota_sheets.GerenciadorCota(0, 0))
+
+@pytest.mark.parametrize('compactar', [True, False])
+@pytest.mark.parametrize('semente', range(5))
+def test_paridade_com_planilhas_geradas(semente, compactar):
+    valores = misturar_casos_de_borda(gerar_planilha(400, semente=semente), semente)
+    df = carregar_dataframe(PlanilhaFalsa(valores), compactar=compactar)
+
+    esperado = varredura_original(df)
+    assert esperado  # a planilha gerada precisa ter pendências para o teste valer
+    assert como_dicts(analisar_pendencias(df)) == esperado
+
+def test_paridade_com_celulas_nulas():
+    # get_all_values só devolve texto; um DataFrame montado à mão pode ter NaN/None
+    tarefa = TAREFAS_PRINCIPAIS[0]
+    df = pd.DataFrame({
+        'Componente Curricular': ['Curso A', None, float('nan'), '', ' Curso B ', 'Curso C', 'Curso D'],
+        f'{tarefa}_Resp': ['Ana', 'Bruno', 'Carla', 'Diego', None, float('nan'), ' Elisa '],
+        f'{tarefa}_Status': ['TRUE', 'TRUE', 'TRUE', 'TRUE', 'TRUE', 'TRUE', None],
+        f'{tarefa}_Planejado': ['03/nov.', None, '3/dez', '09/09', '', 'x', '1/jan'],
+        f'{tarefa}_Realizado_Data': [None, '', float('nan'), 'N/A', None, None, None],
+        'indice_linha_sheets': range(3, 10),
+    })
+
+    assert como_dicts(analisar_pendencias(df)) == varredura_original(df)
+
+def test_sem_colunas_de_tarefa():
+    df = pd.DataFrame({'Componente Curricular': ['Curso A'], 'indice_linha_sheets': [3]})
+    assert analisar_pendencias(df) == varredura_original(df) == []
+
+class PlanilhaCrescida(PlanilhaFalsa):
+    """Aba que ganhou linhas depois que o handle foi aberto: o row_count ficou no tamanho antigo."""
+    row_count = 500
+
+def test_leitura_em_blocos_passa_do_row_count_desatualizado(monkeypatch):
+    monkeypatch.setattr(processador_csv, '_layouts', {})
+    valores = gerar_planilha(1200, semente=1)
+    planilha = PlanilhaCrescida(valores)
+
+    em_blocos = list(iterar_pendencias(ConexaoFalsa(planilha), linhas_por_bloco=250))
+
+    assert como_dicts(em_blocos) == varredura_original(carregar_dataframe(PlanilhaFalsa(valores)))
+    assert planilha.chamadas == {'get': 1 + 5 + 1}  # cabeçalho, 5 blocos com dados e o primeiro vazio